@@ -8,6 +8,22 @@ import re
 import bleach
 
 
+# Patrones de validación compilados una sola vez al importar el módulo.
+# re.ASCII solo donde las clases de caracteres ya son ASCII explícitas.
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$', re.ASCII)
+_UPPERCASE_RE = re.compile(r'[A-Z]', re.ASCII)
+_LOWERCASE_RE = re.compile(r'[a-z]', re.ASCII)
+_DIGIT_RE = re.compile(r'\d')
+_SPECIAL_CHAR_RE = re.compile(r'[!@#$%^&*(),.?":{}|<>]', re.ASCII)
+_IMAGE_MIME_RE = re.compile(r'^data:image/(jpeg|png|jpg|webp);base64,', re.ASCII)
+
+# Palabras reservadas SQL (y nombres sensibles) no permitidas como username
+_FORBIDDEN_USERNAMES = frozenset({
+    'select', 'insert', 'update', 'delete', 'drop', 'union',
+    'exec', 'execute', 'script', 'admin', 'root'
+})
+
+
 class RegisterRequest(BaseModel):
     """DTO para registro de usuario con validación estricta"""
     
@@ -39,13 +55,11 @@ class RegisterRequest(BaseModel):
         v = bleach.clean(v, tags=[], strip=True)
         
         # Solo alfanuméricos y underscore
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
+        if not _USERNAME_RE.match(v):
             raise ValueError('Username solo puede contener letras, números y guiones bajos')
         
         # Prevenir palabras reservadas SQL
-        forbidden = ['select', 'insert', 'update', 'delete', 'drop', 'union', 
-                    'exec', 'execute', 'script', 'admin', 'root']
-        if v.lower() in forbidden:
+        if v.lower() in _FORBIDDEN_USERNAMES:
             raise ValueError('Username no permitido')
         
         return v
@@ -60,16 +74,16 @@ class RegisterRequest(BaseModel):
         if len(v) < 8:
             raise ValueError('La contraseña debe tener al menos 8 caracteres')
         
-        if not re.search(r'[A-Z]', v):
+        if not _UPPERCASE_RE.search(v):
             raise ValueError('La contraseña debe contener al menos una mayúscula')
         
-        if not re.search(r'[a-z]', v):
+        if not _LOWERCASE_RE.search(v):
             raise ValueError('La contraseña debe contener al menos una minúscula')
         
-        if not re.search(r'\d', v):
+        if not _DIGIT_RE.search(v):
             raise ValueError('La contraseña debe contener al menos un número')
         
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', v):
+        if not _SPECIAL_CHAR_RE.search(v):
             raise ValueError('La contraseña debe contener al menos un carácter especial')
         
         return v
@@ -103,7 +117,7 @@ class FaceRegisterRequest(BaseModel):
         # Remover prefijo data:image si existe
         if v.startswith('data:image'):
             # Validar formato MIME
-            if not re.match(r'^data:image/(jpeg|png|jpg|webp);base64,', v):
+            if not _IMAGE_MIME_RE.match(v):
                 raise ValueError('Formato de imagen no soportado')
         
         # Verificar tamaño máximo (5MB en base64)
@@ -123,7 +137,7 @@ class FaceVerifyRequest(BaseModel):
     def validate_image(cls, v: str) -> str:
         """Valida imagen base64"""
         if v.startswith('data:image'):
-            if not re.match(r'^data:image/(jpeg|png|jpg|webp);base64,', v):
+            if not _IMAGE_MIME_RE.match(v):
                 raise ValueError('Formato de imagen no soportado')
         
         if len(v) > 7_000_000:
@@ -8,6 +8,7 @@ import secrets
 import logging
 import base64
 import hashlib
+from functools import lru_cache
 from cryptography.fernet import Fernet
 
 from ...domain.entities.user import User
@@ -17,8 +18,12 @@ from ...config.settings import get_settings
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_encryption_key() -> bytes:
-    """Genera una clave de cifrado derivada del JWT_SECRET"""
+    """
+    Genera una clave de cifrado derivada del JWT_SECRET.
+    Cacheada: PBKDF2 (100000 iteraciones) se ejecuta una sola vez por proceso.
+    """
     settings = get_settings()
     # Usar PBKDF2 para derivar una clave segura del JWT_SECRET
     key = hashlib.pbkdf2_hmac(
@@ -40,6 +45,7 @@ class BackupCodeService:
     def __init__(self, user_repository: UserRepositoryImpl):
         self._user_repo = user_repository
         self._fernet = Fernet(get_encryption_key())
+        self._bcrypt_rounds = get_settings().BCRYPT_ROUNDS
     
     def generate_backup_code(self, user_id: int) -> Optional[str]:
         """
@@ -60,7 +66,7 @@ class BackupCodeService:
         
         # Hash del código con bcrypt
         code_bytes = code.encode('utf-8')
-        salt = bcrypt.gensalt(rounds=12)
+        salt = bcrypt.gensalt(rounds=self._bcrypt_rounds)
         code_hash = bcrypt.hashpw(code_bytes, salt).decode('utf-8')
         
         # Cifrar el código para almacenamiento persistente
@@ -76,7 +76,7 @@ class LoginUserUseCase:
             
             # Resetear intentos fallidos en login exitoso
             user.failed_login_attempts = 0
-            user.lock_until = None
+            user.locked_until = None
             self._user_repository.update(user)
             
             # Generar token JWT
@@ -6,6 +6,7 @@ from typing import Tuple
 import logging
 import json
 
+from ...domain.entities.user import encoding_to_json, encoding_from_json
 from ...domain.interfaces.user_repository import IUserRepository
 from ...domain.interfaces.face_service import IFaceService
 from ..dto.user_dto import FaceRegisterRequest, MessageResponse
@@ -62,7 +63,7 @@ class RegisterFaceUseCase:
                 return False, "Este rostro ya fue registrado en otra cuenta. Solo puede tener una cuenta por rostro.", {}
             
             # Guardar encoding en base de datos
-            encoding_json = json.dumps(encoding)
+            encoding_json = encoding_to_json(encoding)
             updated = self._user_repository.update_face_encoding(user_id, encoding_json)
             
             if not updated:
@@ -99,7 +100,7 @@ class RegisterFaceUseCase:
                     continue
                 
                 try:
-                    stored_encoding = json.loads(existing_user.face_encoding)
+                    stored_encoding = encoding_from_json(existing_user.face_encoding)
                     
                     # Comparar rostros usando el servicio
                     is_match, similarity, _ = self._face_service.verify_face_encoding(
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import logging
 import json
 
+from ...domain.entities.user import encoding_from_json
 from ...domain.interfaces.user_repository import IUserRepository
 from ...domain.interfaces.face_service import IFaceService
 from ...config.settings import get_settings
@@ -69,7 +70,7 @@ class VerifyFaceUseCase:
                 }
             
             # Obtener encoding almacenado
-            stored_encoding = json.loads(user.face_encoding)
+            stored_encoding = encoding_from_json(user.face_encoding)
             
             # Verificación completa con anti-spoofing
             success, details, message = self._face_service.verify_face_with_antispoofing(
@@ -8,6 +8,28 @@ from typing import Optional
 from enum import Enum
 import json
 
+try:
+    # Serializador JSON en C. Escribe sin espacios ([0.1,0.2]) donde json.dumps
+    # escribe [0.1, 0.2]; ambos formatos se parsean igual al leerlos
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def encoding_to_json(encoding) -> str:
+    """Serializa un encoding facial (lista de floats) a texto JSON"""
+    if orjson is not None:
+        # El fallback Haar/LBP produce np.float64, que orjson rechaza sin la opción
+        return orjson.dumps(encoding, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(encoding)
+
+
+def encoding_from_json(data: str) -> list:
+    """Parsea un encoding facial en JSON; lanza json.JSONDecodeError si es inválido"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class UserRole(str, Enum):
     """Roles de usuario en el sistema"""
@@ -16,7 +38,7 @@ class UserRole(str, Enum):
     AUDITOR = "auditor"  # Rol separado para auditoría
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Entidad de dominio que representa un usuario del sistema"""
     
@@ -66,13 +88,13 @@ class User:
         if self.face_encoding is None:
             return None
         try:
-            return json.loads(self.face_encoding)
+            return encoding_from_json(self.face_encoding)
         except json.JSONDecodeError:
             return None
     
     def set_face_encoding_from_list(self, encoding_list: list) -> None:
         """Convierte la lista de encoding a JSON para almacenar"""
-        self.face_encoding = json.dumps(encoding_list)
+        self.face_encoding = encoding_to_json(encoding_list)
         self.face_registered = True
     
     def increment_failed_attempts(self) -> None:
@@ -4,15 +4,21 @@ Usa modelos pre-entrenados de deep learning para identificación biométrica rea
 - YuNet: Detección facial de alta precisión
 - SFace: Embeddings de 128 dimensiones para reconocimiento
 """
-import base64
 import logging
 import os
+from functools import cached_property
 from typing import Tuple, Optional, List
 from pathlib import Path
 
 import numpy as np
 import cv2
 
+try:
+    # Decodificador base64 con SIMD (SSSE3/AVX2/NEON); misma API que base64
+    import pybase64 as base64
+except ImportError:  # pragma: no cover - dependencia opcional
+    import base64
+
 from ...domain.interfaces.face_service import IFaceService
 from ...config.settings import get_settings
 
@@ -33,42 +39,60 @@ class OpenCVDNNFaceService(IFaceService):
         self._settings = get_settings()
         self._threshold = self._settings.FACE_DISTANCE_THRESHOLD
         
+        # Fallback: clasificadores Haar
+        self._face_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        )
+    
+    @cached_property
+    def _dnn_models(self) -> Optional[tuple]:
+        """
+        Carga YuNet + SFace en el primer uso (no en __init__).
+        Retorna (detector, recognizer) o None si no están disponibles.
+        """
         # Rutas de modelos
         yunet_path = MODELS_DIR / "face_detection_yunet.onnx"
         sface_path = MODELS_DIR / "face_recognition_sface.onnx"
         
         # Verificar modelos
-        self._use_dnn = yunet_path.exists() and sface_path.exists()
-        
-        if self._use_dnn:
-            try:
-                # Inicializar detector YuNet
-                self._detector = cv2.FaceDetectorYN.create(
-                    str(yunet_path),
-                    "",
-                    (320, 320),
-                    0.9,  # Score threshold
-                    0.3,  # NMS threshold
-                    5000  # Top K
-                )
-                
-                # Inicializar reconocedor SFace
-                self._recognizer = cv2.FaceRecognizerSF.create(
-                    str(sface_path),
-                    ""
-                )
-                
-                logger.info(" Servicio DNN inicializado con YuNet + SFace")
-            except Exception as e:
-                logger.error(f"Error inicializando DNN: {e}")
-                self._use_dnn = False
-        else:
+        if not (yunet_path.exists() and sface_path.exists()):
             logger.warning(" Modelos DNN no encontrados, usando Haar Cascade")
+            return None
         
-        # Fallback: clasificadores Haar
-        self._face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
+        try:
+            # Inicializar detector YuNet
+            detector = cv2.FaceDetectorYN.create(
+                str(yunet_path),
+                "",
+                (320, 320),
+                0.9,  # Score threshold
+                0.3,  # NMS threshold
+                5000  # Top K
+            )
+            
+            # Inicializar reconocedor SFace
+            recognizer = cv2.FaceRecognizerSF.create(
+                str(sface_path),
+                ""
+            )
+            
+            logger.info(" Servicio DNN inicializado con YuNet + SFace")
+            return detector, recognizer
+        except Exception as e:
+            logger.error(f"Error inicializando DNN: {e}")
+            return None
+    
+    @property
+    def _use_dnn(self) -> bool:
+        return self._dnn_models is not None
+    
+    @property
+    def _detector(self):
+        return self._dnn_models[0]
+    
+    @property
+    def _recognizer(self):
+        return self._dnn_models[1]
     
     def _decode_image(self, image_data: bytes) -> np.ndarray:
         """Decodifica imagen desde base64."""
@@ -98,7 +98,8 @@ async def login(
             if additional_data.get('account_locked') is not None:
                 error_data['account_locked'] = additional_data['account_locked']
             if additional_data.get('locked_until') is not None:
-                error_data['locked_until'] = additional_data['locked_until']
+                # JSONResponse no serializa datetime: se envía en ISO 8601
+                error_data['locked_until'] = additional_data['locked_until'].isoformat()
                 remaining_min = (additional_data['locked_until'] - datetime.now()).seconds // 60
                 error_data['remaining_minutes'] = remaining_min
             if additional_data.get('role') is not None:
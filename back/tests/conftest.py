@@ -1,26 +1,54 @@
 """
 Login Seguro - Configuración de Pytest (Fixtures compartidas)
 """
+from __future__ import annotations
+
 import pytest
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
-from unittest.mock import Mock, MagicMock
-from typing import Optional, List
+from types import SimpleNamespace
+from unittest.mock import Mock
+from typing import TYPE_CHECKING, Optional
+
+# Extensiones nativas precargadas: cada worker (xdist) paga su inicialización
+# al arrancar y no dentro del primer test que las usa
+import bcrypt
+import cryptography.fernet  # noqa: F401
+
+# Los módulos de la app se importan dentro de cada fixture para que la
+# colección de tests no cargue el dominio/DTOs hasta que se necesiten
+if TYPE_CHECKING:
+    from app.domain.entities.user import User
+    from app.application.dto.user_dto import (
+        RegisterRequest, LoginRequest,
+        FaceRegisterRequest, FaceVerifyRequest
+    )
+
+
+@dataclass
+class FakeClient:
+    """Cliente HTTP mínimo (equivalente a request.client)"""
+    host: str
 
-from app.domain.entities.user import User, UserRole
-from app.domain.interfaces.user_repository import IUserRepository
-from app.domain.interfaces.face_service import IFaceService
-from app.application.dto.user_dto import (
-    RegisterRequest, LoginRequest, 
-    FaceRegisterRequest, FaceVerifyRequest,
-    UserResponse, TokenResponse
-)
+
+@dataclass
+class FakeRequest:
+    """Request mínimo con headers y cliente, sin la sobrecarga de Mock()"""
+    headers: dict = field(default_factory=dict)
+    client: Optional[FakeClient] = None
+
+
+# Fecha fija para los timestamps de los usuarios (tests deterministas)
+_ANCHOR = datetime(2024, 1, 1, 12, 0, 0)
 
 
 # ============= USER FIXTURES =============
 
-@pytest.fixture
-def sample_user() -> User:
-    """Usuario de ejemplo para tests"""
+@pytest.fixture(scope="session")
+def _base_user() -> User:
+    """Usuario base; las variantes se derivan con dataclasses.replace()"""
+    from app.domain.entities.user import User, UserRole
+
     return User(
         id=1,
         username="testuser",
@@ -35,105 +63,93 @@ def sample_user() -> User:
         backup_code_hash=None,
         backup_code_encrypted=None,
         active_session_token=None,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        created_at=_ANCHOR,
+        updated_at=_ANCHOR
     )
 
 
 @pytest.fixture
-def admin_user() -> User:
+def sample_user(_base_user) -> User:
+    """Usuario de ejemplo para tests"""
+    return replace(_base_user)
+
+
+@pytest.fixture
+def admin_user(_base_user) -> User:
     """Usuario admin de ejemplo"""
-    return User(
+    from app.domain.entities.user import UserRole
+
+    return replace(
+        _base_user,
         id=2,
         username="adminuser",
         email="admin@example.com",
-        password_hash="$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X.NRZ8Z1v4W1G1WdS",
         face_encoding='[0.1, 0.2, 0.3]',
         face_registered=True,
-        failed_login_attempts=0,
-        locked_until=None,
         role=UserRole.ADMIN,
-        requires_password_reset=False,
         backup_code_hash="$2b$12$somehash",
-        backup_code_encrypted="encrypted_code",
-        active_session_token=None,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        backup_code_encrypted="encrypted_code"
     )
 
 
 @pytest.fixture
-def locked_user() -> User:
+def locked_user(_base_user) -> User:
     """Usuario bloqueado de ejemplo"""
-    return User(
+    return replace(
+        _base_user,
         id=3,
         username="lockeduser",
         email="locked@example.com",
-        password_hash="$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X.NRZ8Z1v4W1G1WdS",
-        face_encoding=None,
-        face_registered=False,
         failed_login_attempts=5,
-        locked_until=datetime.now() + timedelta(minutes=15),
-        role=UserRole.USER,
-        requires_password_reset=False,
-        backup_code_hash=None,
-        backup_code_encrypted=None,
-        active_session_token=None,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        # User.is_locked() compara contra el reloj real
+        locked_until=datetime.now() + timedelta(minutes=15)
     )
 
 
 @pytest.fixture
-def user_with_active_session() -> User:
+def user_with_active_session(_base_user) -> User:
     """Usuario con sesión activa"""
-    return User(
+    return replace(
+        _base_user,
         id=4,
         username="activeuser",
         email="active@example.com",
-        password_hash="$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X.NRZ8Z1v4W1G1WdS",
         face_encoding='[0.1, 0.2, 0.3]',
         face_registered=True,
-        failed_login_attempts=0,
-        locked_until=None,
-        role=UserRole.USER,
-        requires_password_reset=False,
-        backup_code_hash=None,
-        backup_code_encrypted=None,
-        active_session_token="existing_session_token_123",
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        active_session_token="existing_session_token_123"
     )
 
 
 @pytest.fixture
-def user_requiring_password_reset() -> User:
+def user_requiring_password_reset(_base_user) -> User:
     """Usuario que requiere cambio de contraseña"""
-    return User(
+    return replace(
+        _base_user,
         id=5,
         username="resetuser",
         email="reset@example.com",
-        password_hash="$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X.NRZ8Z1v4W1G1WdS",
-        face_encoding=None,
-        face_registered=False,
-        failed_login_attempts=0,
-        locked_until=None,
-        role=UserRole.USER,
-        requires_password_reset=True,
-        backup_code_hash=None,
-        backup_code_encrypted=None,
-        active_session_token=None,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        requires_password_reset=True
     )
 
 
 # ============= MOCK REPOSITORIES =============
 
+@pytest.fixture(scope="session")
+def _user_repo_spec() -> list:
+    """
+    Métodos públicos de IUserRepository, calculados una vez.
+    Mock(spec=<lista>) evita inspeccionar la clase en cada construcción;
+    no se copia un Mock plantilla porque copy.copy comparte los hijos.
+    """
+    from app.domain.interfaces.user_repository import IUserRepository
+
+    return [name for name in dir(IUserRepository) if not name.startswith("_")]
+
+
 @pytest.fixture
-def mock_user_repository() -> Mock:
+def mock_user_repository(_user_repo_spec) -> Mock:
     """Mock del repositorio de usuarios"""
-    repo = Mock(spec=IUserRepository)
+    repo = Mock(spec_set=_user_repo_spec)
     repo.create = Mock(return_value=None)
     repo.find_by_id = Mock(return_value=None)
     repo.find_by_username = Mock(return_value=None)
@@ -148,7 +164,9 @@ def mock_user_repository() -> Mock:
 @pytest.fixture
 def mock_face_service() -> Mock:
     """Mock del servicio de reconocimiento facial"""
-    service = Mock(spec=IFaceService)
+    from app.domain.interfaces.face_service import IFaceService
+
+    service = Mock(spec_set=IFaceService)
     service.extract_face_encoding = Mock(return_value=(True, [0.1] * 128, "Encoding extraído"))
     service.verify_face = Mock(return_value=(True, 0.3, "Verificación exitosa"))
     service.detect_spoofing = Mock(return_value=(True, 0.95, "Rostro real"))
@@ -160,39 +178,131 @@ def mock_face_service() -> Mock:
     return service
 
 
+class _AuditStub:
+    """Servicio de auditoría no-op (para tests que solo necesitan que sea awaitable)"""
+
+    async def log_action(self, *args, **kwargs) -> int:
+        return 1
+
+
+@pytest.fixture(scope="session")
+def audit_stub() -> _AuditStub:
+    """Stub compartido del servicio de auditoría"""
+    return _AuditStub()
+
+
+@pytest.fixture(scope="session")
+def make_fake_request():
+    """Construye un FakeRequest; sin host, request.client queda en None"""
+    def make(headers=None, host=None) -> FakeRequest:
+        return FakeRequest(
+            headers={} if headers is None else headers,
+            client=FakeClient(host) if host else None
+        )
+    return make
+
+
+@pytest.fixture(scope="session")
+def fake_request() -> SimpleNamespace:
+    """Request HTTP mínimo para llamar rutas directamente"""
+    return SimpleNamespace(
+        client=SimpleNamespace(host="127.0.0.1"),
+        headers={},
+        url=SimpleNamespace(path="/")
+    )
+
+
+@pytest.fixture(scope="session")
+def fake_new_user() -> SimpleNamespace:
+    """Usuario recién registrado devuelto por un use case falso (no mutar)"""
+    return SimpleNamespace(id=10, username="newuser")
+
+
+@pytest.fixture(scope="session")
+def fake_token_resp() -> SimpleNamespace:
+    """Respuesta de login exitoso devuelta por un use case falso (no mutar)"""
+    return SimpleNamespace(
+        access_token="abc",
+        token_type="bearer",
+        expires_in=3600,
+        user={"id": 1},
+        requires_face_registration=False
+    )
+
+
+@pytest.fixture(scope="session")
+def req_localhost() -> FakeRequest:
+    """Request desde localhost (no mutar: compartido en la sesión)"""
+    return FakeRequest(headers={"User-Agent": "Test"}, client=FakeClient("127.0.0.1"))
+
+
+@pytest.fixture(scope="session")
+def req_public_ip() -> FakeRequest:
+    """Request desde una IP pública (no mutar: compartido en la sesión)"""
+    return FakeRequest(
+        headers={"User-Agent": "Mozilla/5.0", "X-Real-IP": "190.1.2.3"},
+        client=FakeClient("190.1.2.3")
+    )
+
+
+# ============= FAST BCRYPT =============
+
+_real_gensalt = bcrypt.gensalt
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _low_cost_bcrypt():
+    """
+    bcrypt real con costo mínimo (4) en toda la sesión: la app fija
+    rounds=12 en cada gensalt y los tests solo validan formato/semántica.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(bcrypt, "gensalt", lambda rounds=12, prefix=b"2b": _real_gensalt(4, prefix))
+        yield
+
+
 # ============= DTO FIXTURES =============
+# Los valores son constantes ya válidas: se construyen sin re-validar
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_register_request() -> RegisterRequest:
     """Request de registro válido"""
-    return RegisterRequest(
+    from app.application.dto.user_dto import RegisterRequest
+
+    return RegisterRequest.model_construct(
         username="newuser",
         password="Secure@Password123",
         email="newuser@example.com"
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_login_request() -> LoginRequest:
     """Request de login válido"""
-    return LoginRequest(
+    from app.application.dto.user_dto import LoginRequest
+
+    return LoginRequest.model_construct(
         username="testuser",
         password="Test@123"
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_face_verify_request() -> FaceVerifyRequest:
     """Request de verificación facial válido"""
-    return FaceVerifyRequest(
+    from app.application.dto.user_dto import FaceVerifyRequest
+
+    return FaceVerifyRequest.model_construct(
         image_data="data:image/jpeg;base64,/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgGBgcGBQ..."
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_face_register_request() -> FaceRegisterRequest:
     """Request de registro facial válido"""
-    return FaceRegisterRequest(
+    from app.application.dto.user_dto import FaceRegisterRequest
+
+    return FaceRegisterRequest.model_construct(
         image_data="data:image/jpeg;base64,/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgGBgcGBQ..."
     )
 
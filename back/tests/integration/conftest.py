@@ -0,0 +1,24 @@
+"""
+Login Seguro - Configuración de Pytest para tests de integración
+"""
+import pytest
+import pytest_asyncio
+import httpx
+
+from app.main import app
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_openapi():
+    """Genera el schema OpenAPI una sola vez para toda la sesión"""
+    app.openapi()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """Cliente de prueba asíncrono para FastAPI (compartido en la sesión)"""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test"
+    ) as test_client:
+        yield test_client
@@ -0,0 +1,61 @@
+"""
+Login Seguro - Fixtures compartidas de los tests unitarios
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+
+
+class _StubCursor:
+    """Cursor mínimo: solo execute/fetchone/fetchall/rowcount"""
+    __slots__ = ("execute", "fetchone", "fetchall", "rowcount")
+    
+    def __init__(self):
+        self.execute = Mock()
+        self.fetchone = Mock(return_value=None)
+        self.fetchall = Mock(return_value=[])
+        self.rowcount = 0
+    
+    def reset(self):
+        """Deja el cursor como recién creado"""
+        for method in (self.execute, self.fetchone, self.fetchall):
+            method.reset_mock(return_value=True, side_effect=True)
+        self.fetchone.return_value = None
+        self.fetchall.return_value = []
+        self.rowcount = 0
+
+
+class _StubDB:
+    """DatabaseConnection mínima: get_cursor() como context manager"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def get_cursor(self, commit=True):
+        return self
+    
+    def __enter__(self):
+        return self._cursor
+    
+    def __exit__(self, *exc):
+        return None
+
+
+@pytest.fixture(scope="session")
+def make_stub_db():
+    """Construye un par (DatabaseConnection, cursor) simulados"""
+    def make():
+        cursor = _StubCursor()
+        return _StubDB(cursor), cursor
+    return make
+
+
+@pytest.fixture(scope="session")
+def user_row() -> tuple:
+    """Fila simulada (15 columnas) de un usuario normal, con timestamps fijos"""
+    fixed_ts = datetime(2024, 1, 1)
+    return (
+        1, "testuser", "test@example.com", "hash", None, False,
+        0, None, "user", False, None, None, None,
+        fixed_ts, fixed_ts
+    )
@@ -1,5 +1,8 @@
 import pytest
+from dataclasses import dataclass
+from datetime import datetime
 from types import SimpleNamespace
+from typing import Optional
 from unittest.mock import AsyncMock, Mock
 from fastapi import HTTPException
 
@@ -7,17 +10,17 @@ from app.presentation.routes import admin_routes
 from app.application.dto.user_dto import MessageResponse
 
 
+@dataclass(frozen=True, slots=True)
 class FakeUser:
-    def __init__(self, id=1, username="user", email=None, role="user", face_registered=False, locked=False):
-        self.id = id
-        self.username = username
-        self.email = email
-        self.role = role
-        self.face_registered = face_registered
-        self.locked_until = None
-        self.failed_login_attempts = 0
-        self.requires_password_reset = False
-        self._locked = locked
+    id: int = 1
+    username: str = "user"
+    email: Optional[str] = None
+    role: str = "user"
+    face_registered: bool = False
+    locked_until: Optional[datetime] = None
+    failed_login_attempts: int = 0
+    requires_password_reset: bool = False
+    _locked: bool = False
 
     def is_admin(self):
         return self.role == "admin"
@@ -26,73 +29,83 @@ class FakeUser:
         return self._locked
 
 
-@pytest.mark.asyncio
-async def test_list_users_returns_user_list():
-    admin = SimpleNamespace(id=99, username="admin")
-    u1 = FakeUser(id=1, username="alice", email="a@example.com", role="user", face_registered=True)
-    u2 = FakeUser(id=2, username="bob", email=None, role="auditor", face_registered=False)
-
-    mock_repo = Mock()
-    mock_repo.find_all_users.return_value = [u1, u2]
+ADMIN = SimpleNamespace(id=99, username="admin")
 
-    resp = await admin_routes.list_users(admin=admin, user_repo=mock_repo)
 
-    assert resp.success is True
-    assert resp.total == 2
-    assert resp.users[0].username == "alice"
+@pytest.fixture(scope="session")
+def admin():
+    return ADMIN
 
 
-@pytest.mark.asyncio
-async def test_unlock_user_user_not_found_raises_404():
-    admin = SimpleNamespace(id=99, username="admin")
+@pytest.fixture
+def admin_unlock_case(request):
+    """Repo simulado para cada escenario de unlock_user -> (repo, status esperado)"""
     mock_repo = Mock()
-    mock_repo.find_by_id.return_value = None
+    scenario = request.param
+    if scenario == "not_found":
+        mock_repo.find_by_id.return_value = None
+        return mock_repo, 404
+    if scenario == "is_admin":
+        mock_repo.find_by_id.return_value = FakeUser(id=5, username="admin", role="admin")
+        return mock_repo, 400
+    mock_repo.find_by_id.return_value = FakeUser(id=5, username="johndoe", role="user")
+    if scenario == "db_fail":
+        mock_repo.unlock_user.return_value = False
+        return mock_repo, 500
+    mock_repo.unlock_user.return_value = True
+    return mock_repo, None
 
-    with pytest.raises(HTTPException) as exc:
-        await admin_routes.unlock_user(request=Mock(), user_id=123, admin=admin, user_repo=mock_repo, audit_service=AsyncMock())
 
-    assert exc.value.status_code == 404
+@pytest.fixture
+def admin_create_case(request):
+    """Repo simulado para cada escenario de create_user -> (repo, data, status esperado)"""
+    mock_repo = Mock()
+    scenario = request.param
+    if scenario == "username_conflict":
+        mock_repo.find_by_username.return_value = FakeUser(id=2, username="exists")
+        return mock_repo, SimpleNamespace(username="exists", email=None, role="user"), 400
+    mock_repo.find_by_username.return_value = None
+    if scenario == "email_conflict":
+        mock_repo.find_by_email.return_value = FakeUser(id=3, username="other")
+        return mock_repo, SimpleNamespace(username="newuser", email="a@b.com", role="user"), 400
+    mock_repo.find_by_email.return_value = None
+    mock_repo.create.return_value = FakeUser(id=77, username="newuser", role="user")
+    return mock_repo, SimpleNamespace(username="newuser", email=None, role="user"), None
 
 
 @pytest.mark.asyncio
-async def test_unlock_user_admin_cannot_be_modified():
-    admin = SimpleNamespace(id=99, username="admin")
-    admin_user = FakeUser(id=123, username="admin", role="admin")
+async def test_list_users_returns_user_list(admin):
+    u1 = FakeUser(id=1, username="alice", email="a@example.com", role="user", face_registered=True)
+    u2 = FakeUser(id=2, username="bob", email=None, role="auditor", face_registered=False)
+
     mock_repo = Mock()
-    mock_repo.find_by_id.return_value = admin_user
+    mock_repo.find_all_users.return_value = [u1, u2]
 
-    with pytest.raises(HTTPException) as exc:
-        await admin_routes.unlock_user(request=Mock(), user_id=123, admin=admin, user_repo=mock_repo, audit_service=AsyncMock())
+    resp = await admin_routes.list_users(admin=admin, user_repo=mock_repo)
 
-    assert exc.value.status_code == 400
+    assert resp.success is True
+    assert resp.total == 2
+    assert resp.users[0].username == "alice"
 
 
 @pytest.mark.asyncio
-async def test_unlock_user_db_failure_raises_500():
-    admin = SimpleNamespace(id=99, username="admin")
-    target = FakeUser(id=5, username="johndoe", role="user")
-    mock_repo = Mock()
-    mock_repo.find_by_id.return_value = target
-    mock_repo.unlock_user.return_value = False
-
-    with pytest.raises(HTTPException) as exc:
-        await admin_routes.unlock_user(request=Mock(), user_id=5, admin=admin, user_repo=mock_repo, audit_service=AsyncMock())
-
-    assert exc.value.status_code == 500
+@pytest.mark.parametrize(
+    "admin_unlock_case", ["not_found", "is_admin", "db_fail", "success"], indirect=True
+)
+async def test_unlock_user(admin_unlock_case, admin, audit_stub, fake_request):
+    mock_repo, expected_status = admin_unlock_case
 
+    if expected_status is not None:
+        with pytest.raises(HTTPException) as exc:
+            await admin_routes.unlock_user(request=fake_request, user_id=5, admin=admin, user_repo=mock_repo, audit_service=audit_stub)
 
-@pytest.mark.asyncio
-async def test_unlock_user_success_calls_audit_and_returns_message():
-    admin = SimpleNamespace(id=99, username="admin")
-    target = FakeUser(id=5, username="johndoe", role="user")
-    mock_repo = Mock()
-    mock_repo.find_by_id.return_value = target
-    mock_repo.unlock_user.return_value = True
+        assert exc.value.status_code == expected_status
+        return
 
     mock_audit = AsyncMock()
     mock_audit.log_action.return_value = 1
 
-    resp = await admin_routes.unlock_user(request=Mock(), user_id=5, admin=admin, user_repo=mock_repo, audit_service=mock_audit)
+    resp = await admin_routes.unlock_user(request=fake_request, user_id=5, admin=admin, user_repo=mock_repo, audit_service=mock_audit)
 
     assert isinstance(resp, MessageResponse)
     assert resp.success is True
@@ -102,46 +115,22 @@ async def test_unlock_user_success_calls_audit_and_returns_message():
 
 
 @pytest.mark.asyncio
-async def test_create_user_username_conflict_raises_400():
-    admin = SimpleNamespace(id=99, username="admin")
-    mock_repo = Mock()
-    mock_repo.find_by_username.return_value = FakeUser(id=2, username="exists")
-
-    data = SimpleNamespace(username="exists", email=None, role="user")
-
-    with pytest.raises(HTTPException) as exc:
-        await admin_routes.create_user(request=Mock(), data=data, admin=admin, user_repo=mock_repo, audit_service=AsyncMock())
+@pytest.mark.parametrize(
+    "admin_create_case", ["username_conflict", "email_conflict", "success"], indirect=True
+)
+async def test_create_user(admin_create_case, admin, audit_stub, fake_request):
+    mock_repo, data, expected_status = admin_create_case
 
-    assert exc.value.status_code == 400
-
-
-@pytest.mark.asyncio
-async def test_create_user_email_conflict_raises_400():
-    admin = SimpleNamespace(id=99, username="admin")
-    mock_repo = Mock()
-    mock_repo.find_by_username.return_value = None
-    mock_repo.find_by_email.return_value = FakeUser(id=3, username="other")
-
-    data = SimpleNamespace(username="newuser", email="a@b.com", role="user")
-
-    with pytest.raises(HTTPException) as exc:
-        await admin_routes.create_user(request=Mock(), data=data, admin=admin, user_repo=mock_repo, audit_service=AsyncMock())
-
-    assert exc.value.status_code == 400
-
-
-@pytest.mark.asyncio
-async def test_create_user_success_calls_repo_and_audit():
-    admin = SimpleNamespace(id=99, username="admin")
-    mock_repo = Mock()
-    mock_repo.find_by_username.return_value = None
-    mock_repo.find_by_email.return_value = None
+    if expected_status is not None:
+        with pytest.raises(HTTPException) as exc:
+            await admin_routes.create_user(request=fake_request, data=data, admin=admin, user_repo=mock_repo, audit_service=audit_stub)
 
-    created = FakeUser(id=77, username="newuser", role="user")
-    mock_repo.create.return_value = created
+        assert exc.value.status_code == expected_status
+        mock_repo.create.assert_not_called()
+        return
 
     mock_audit = AsyncMock()
-    resp = await admin_routes.create_user(request=Mock(), data=SimpleNamespace(username="newuser", email=None, role="user"), admin=admin, user_repo=mock_repo, audit_service=mock_audit)
+    resp = await admin_routes.create_user(request=fake_request, data=data, admin=admin, user_repo=mock_repo, audit_service=mock_audit)
 
     assert resp.success is True
     assert resp.data["user_id"] == 77
@@ -4,14 +4,17 @@ Objetivo: Subir cobertura de 25% a >95%
 
 Estrategia de mocking:
 - Mock get_db() para evitar conexión real
-- Mock httpx.AsyncClient para geolocalización
+- pytest-httpx (httpx_mock) para las APIs de geolocalización / IP pública
 - Mock Request de FastAPI
 - Probar todas las ramas if/else
 """
+import importlib.util
+import httpx
 import pytest
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 
+from app.infrastructure.services import audit_service as audit_service_module
 from app.infrastructure.services.audit_service import (
     AuditService, 
     AuditLog,
@@ -19,170 +22,141 @@ from app.infrastructure.services.audit_service import (
 )
 
 
+# httpx_mock viene del plugin pytest-httpx (requirements-test.txt); sin él
+# esos tests se omiten en lugar de fallar con "fixture 'httpx_mock' not found"
+requires_httpx_mock = pytest.mark.skipif(
+    importlib.util.find_spec("pytest_httpx") is None,
+    reason="requiere pytest-httpx"
+)
+
+
+class ExplodingHeaders(dict):
+    """Headers cuyo acceso lanza excepción"""
+
+    def get(self, *args, **kwargs):
+        raise Exception("Header error")
+
+
+@pytest.fixture(autouse=True)
+def _reset_audit_service_singleton(monkeypatch):
+    """Aísla el singleton de get_audit_service entre tests (seguro con xdist/--forked)"""
+    monkeypatch.setattr(audit_service_module, "_audit_service", None)
+
+
 @pytest.fixture
-def mock_db():
+def db_and_cursor():
     """
-    Mock de la conexión de base de datos.
+    Mock de la conexión de base de datos y su cursor -> (db, cursor).
     
     CRÍTICO: get_cursor() se usa como context manager (with statement),
     por lo que necesitamos MagicMock para soportar __enter__/__exit__.
+    Los tests configuran el cursor directamente en lugar de recorrer
+    db.get_cursor.return_value.__enter__.return_value.
     """
-    db = MagicMock()
-    
-    # Cursor mockeado que se retorna por __enter__
     cursor = MagicMock()
     cursor.fetchone.return_value = (123,)  # ID del registro insertado
     cursor.fetchall.return_value = []
     
-    # Configurar get_cursor() para retornar un context manager válido
-    # MagicMock automáticamente maneja __enter__ y __exit__
-    db.get_cursor.return_value.__enter__.return_value = cursor
-    db.get_cursor.return_value.__exit__.return_value = None
+    db = MagicMock()
+    ctx = db.get_cursor.return_value
+    ctx.__enter__.return_value = cursor
+    ctx.__exit__.return_value = None
     
-    return db
+    return db, cursor
+
+
+@pytest.fixture
+def mock_db(db_and_cursor):
+    """Mock de la conexión de base de datos"""
+    return db_and_cursor[0]
+
+
+@pytest.fixture
+def service(mock_db):
+    """AuditService construido normalmente, con get_db() apuntando a la BD mockeada"""
+    with patch('app.infrastructure.services.audit_service.get_db', return_value=mock_db):
+        yield AuditService()
 
 
 @pytest.fixture
-def mock_request():
+def ipapi_response(httpx_mock):
+    """Factory: registra una respuesta de ip-api.com para la IP indicada"""
+    def _add(ip, country="Ecuador", city="Quito", region="Pichincha", status="success"):
+        httpx_mock.add_response(
+            url=f"http://ip-api.com/json/{ip}?lang=es",
+            json={"status": status, "country": country, "city": city, "regionName": region}
+        )
+    return _add
+
+
+@pytest.fixture
+def frozen_time():
+    """Congela datetime.now() del servicio (y ZoneInfo, para evitar error en Windows)"""
+    with patch('app.infrastructure.services.audit_service.datetime') as mock_datetime, \
+            patch('zoneinfo.ZoneInfo'):
+        # datetime.now() retorna objeto con método replace
+        mock_now_result = Mock()
+        mock_now_result.replace.return_value = datetime(2026, 2, 5, 10, 30, 0)
+        mock_datetime.now.return_value = mock_now_result
+        yield mock_datetime
+
+
+@pytest.fixture
+def mock_request(make_fake_request):
     """Mock de FastAPI Request"""
-    request = Mock()
-    request.headers = {"User-Agent": "Test Browser"}
-    request.client = Mock()
-    request.client.host = "192.168.1.100"
-    return request
+    return make_fake_request({"User-Agent": "Test Browser"}, "192.168.1.100")
 
 
 class TestAuditServiceGetRealIP:
     """Tests para get_real_ip - extracción de IP con diferentes headers"""
     
-    def test_get_real_ip_from_x_forwarded_for(self, mock_db):
-        """Test: Extrae IP de X-Forwarded-For (prioridad más alta)"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        request = Mock()
-        request.headers = {"X-Forwarded-For": "203.0.113.1, 198.51.100.1"}
-        request.client = Mock()
-        request.client.host = "10.0.0.1"
-        
-        ip = service.get_real_ip(request)
-        
-        # Debe tomar la primera IP de X-Forwarded-For
-        assert ip == "203.0.113.1"
-    
-    def test_get_real_ip_from_x_real_ip(self, mock_db):
-        """Test: Extrae IP de X-Real-IP cuando X-Forwarded-For no existe"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        request = Mock()
-        request.headers = {"X-Real-IP": "198.51.100.50"}
-        request.client = Mock()
-        request.client.host = "10.0.0.1"
-        
-        ip = service.get_real_ip(request)
-        
-        assert ip == "198.51.100.50"
-    
-    def test_get_real_ip_from_cloudflare(self, mock_db):
-        """Test: Extrae IP de CF-Connecting-IP (Cloudflare)"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        request = Mock()
-        request.headers = {"CF-Connecting-IP": "203.0.113.100"}
-        request.client = Mock()
-        request.client.host = "10.0.0.1"
-        
-        ip = service.get_real_ip(request)
-        
-        assert ip == "203.0.113.100"
-    
-    def test_get_real_ip_from_client_fallback(self, mock_db):
-        """Test: Fallback a request.client.host cuando no hay headers"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        request = Mock()
-        request.headers = {}
-        request.client = Mock()
-        request.client.host = "192.168.1.50"
-        
-        ip = service.get_real_ip(request)
-        
-        assert ip == "192.168.1.50"
-    
-    def test_get_real_ip_returns_unknown_when_no_client(self, mock_db):
-        """Test: Retorna 'unknown' cuando no hay información de cliente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        request = Mock()
-        request.headers = {}
-        request.client = None
-        
-        ip = service.get_real_ip(request)
-        
-        assert ip == "unknown"
+    @pytest.mark.parametrize("headers,client_host,expected", [
+        # X-Forwarded-For (prioridad más alta): toma la primera IP
+        ({"X-Forwarded-For": "203.0.113.1, 198.51.100.1"}, "10.0.0.1", "203.0.113.1"),
+        # X-Real-IP cuando X-Forwarded-For no existe
+        ({"X-Real-IP": "198.51.100.50"}, "10.0.0.1", "198.51.100.50"),
+        # CF-Connecting-IP (Cloudflare)
+        ({"CF-Connecting-IP": "203.0.113.100"}, "10.0.0.1", "203.0.113.100"),
+        # Fallback a request.client.host cuando no hay headers
+        ({}, "192.168.1.50", "192.168.1.50"),
+        # 'unknown' cuando no hay información de cliente
+        ({}, None, "unknown"),
+    ], ids=["x_forwarded_for", "x_real_ip", "cloudflare", "client_fallback", "no_client"])
+    def test_get_real_ip(self, service, make_fake_request, headers, client_host, expected):
+        """Test: Extrae la IP real según headers de proxy o cliente directo"""
+        request = make_fake_request(headers, client_host)
+        
+        assert service.get_real_ip(request) == expected
 
 
 class TestAuditServiceGetLocationFromIP:
     """Tests para get_location_from_ip - geolocalización"""
     
-    @pytest.mark.asyncio
-    async def test_get_location_for_local_dev(self, mock_db):
+    async def test_get_location_for_local_dev(self, service):
         """Test: Retorna ubicación configurada para desarrollo local"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
         location = await service.get_location_from_ip("200.1.2.3", is_local_dev=True)
         
         assert location["country"] == "Ecuador"
         assert location["city"] == "Sangolquí"
         assert location["region"] == "Pichincha"
     
-    @pytest.mark.asyncio
-    async def test_get_location_for_localhost(self, mock_db):
+    @pytest.mark.parametrize("local_ip", ["127.0.0.1", "localhost", "::1"])
+    async def test_get_location_for_localhost(self, service, local_ip):
         """Test: Retorna ubicación configurada para localhost"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        for local_ip in ["127.0.0.1", "localhost", "::1"]:
-            location = await service.get_location_from_ip(local_ip)
-            assert location["country"] == "Ecuador"
+        location = await service.get_location_from_ip(local_ip)
+        assert location["country"] == "Ecuador"
     
-    @pytest.mark.asyncio
-    async def test_get_location_for_private_ips(self, mock_db):
+    @pytest.mark.parametrize("private_ip", ["192.168.1.1", "10.0.0.1", "172.16.0.1"])
+    async def test_get_location_for_private_ips(self, service, private_ip):
         """Test: Retorna ubicación configurada para IPs privadas"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        private_ips = ["192.168.1.1", "10.0.0.1", "172.16.0.1"]
-        
-        for private_ip in private_ips:
-            location = await service.get_location_from_ip(private_ip)
-            assert location["country"] == "Ecuador"
+        location = await service.get_location_from_ip(private_ip)
+        assert location["country"] == "Ecuador"
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_get_location_from_api_success(self, mock_httpx_client, mock_db):
+    @requires_httpx_mock
+    async def test_get_location_from_api_success(self, ipapi_response, service):
         """Test: Obtiene ubicación de API ip-api.com exitosamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock respuesta exitosa de API
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "success",
-            "country": "United States",
-            "city": "New York",
-            "regionName": "New York"
-        }
-        
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
+        # Respuesta exitosa de API
+        ipapi_response("8.8.8.8", country="United States", city="New York", region="New York")
         
         location = await service.get_location_from_ip("8.8.8.8")
         
@@ -190,38 +164,25 @@ class TestAuditServiceGetLocationFromIP:
         assert location["city"] == "New York"
         assert location["region"] == "New York"
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_get_location_api_failure(self, mock_httpx_client, mock_db):
+    @requires_httpx_mock
+    async def test_get_location_api_failure(self, ipapi_response, service):
         """Test: Fallback a Ecuador cuando API falla"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock respuesta con error
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"status": "fail"}
-        
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
+        # Respuesta con error
+        ipapi_response("8.8.8.8", status="fail")
         
         location = await service.get_location_from_ip("8.8.8.8")
         
         # Debe usar fallback
         assert location["country"] == "Ecuador"
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_get_location_api_exception(self, mock_httpx_client, mock_db):
+    @requires_httpx_mock
+    async def test_get_location_api_exception(self, httpx_mock, service):
         """Test: Maneja excepción de API correctamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock excepción de red
-        mock_client = AsyncMock()
-        mock_client.get.side_effect = Exception("Network error")
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
+        # Excepción de red
+        httpx_mock.add_exception(
+            httpx.ConnectError("Network error"),
+            url="http://ip-api.com/json/8.8.8.8?lang=es"
+        )
         
         location = await service.get_location_from_ip("8.8.8.8")
         
@@ -232,80 +193,37 @@ class TestAuditServiceGetLocationFromIP:
 class TestAuditServiceGetPublicIP:
     """Tests para get_public_ip"""
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_get_public_ip_success(self, mock_httpx_client, mock_db):
+    @requires_httpx_mock
+    async def test_get_public_ip_success(self, httpx_mock, service):
         """Test: Obtiene IP pública exitosamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = "203.0.113.50"
-        
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
+        httpx_mock.add_response(url="https://api.ipify.org", text="203.0.113.50")
         
         public_ip = await service.get_public_ip()
         
         assert public_ip == "203.0.113.50"
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_get_public_ip_failure(self, mock_httpx_client, mock_db):
+    @requires_httpx_mock
+    async def test_get_public_ip_failure(self, httpx_mock, service):
         """Test: Retorna string vacío cuando falla"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        mock_client = AsyncMock()
-        mock_client.get.side_effect = Exception("Timeout")
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
+        httpx_mock.add_exception(httpx.ReadTimeout("Timeout"), url="https://api.ipify.org")
         
         public_ip = await service.get_public_ip()
         
         assert public_ip == ""
 
 
+@pytest.mark.usefixtures("frozen_time")
 class TestAuditServiceLogAction:
     """Tests para log_action - registro de acciones de auditoría"""
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.datetime')
-    @patch('zoneinfo.ZoneInfo')  # Parchear ZoneInfo para evitar error en Windows
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_log_action_success(self, mock_httpx_client, mock_zoneinfo, mock_datetime, mock_db):
+    @requires_httpx_mock
+    async def test_log_action_success(self, ipapi_response, service, db_and_cursor, req_public_ip):
         """Test: Registra acción exitosamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock datetime.now() para retornar objeto con método replace
-        fixed_time = datetime(2026, 2, 5, 10, 30, 0)
-        mock_now_result = Mock()
-        mock_now_result.replace.return_value = fixed_time
-        mock_datetime.now.return_value = mock_now_result
-        
         # Mock API de geolocalización
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "success",
-            "country": "Ecuador",
-            "city": "Quito",
-            "regionName": "Pichincha"
-        }
-        
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
-        
-        request = Mock()
-        request.headers = {"User-Agent": "Mozilla/5.0", "X-Real-IP": "190.1.2.3"}
-        request.client = Mock()
-        request.client.host = "190.1.2.3"
+        ipapi_response("190.1.2.3")
         
         result = await service.log_action(
-            request=request,
+            request=req_public_ip,
             action="unlock_user",
             admin_id=1,
             admin_username="admin",
@@ -316,49 +234,18 @@ class TestAuditServiceLogAction:
         
         assert result == 123  # ID retornado por mock_db
         # Verificar que se ejecutó el query
-        mock_db.get_cursor.return_value.__enter__.return_value.execute.assert_called_once()
+        _, cursor = db_and_cursor
+        cursor.execute.assert_called_once()
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.datetime')
-    @patch('zoneinfo.ZoneInfo')  # Parchear ZoneInfo para evitar error en Windows
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_log_action_with_localhost_gets_public_ip(self, mock_httpx_client, mock_zoneinfo, mock_datetime, mock_db):
+    @requires_httpx_mock
+    async def test_log_action_with_localhost_gets_public_ip(self, httpx_mock, service, req_localhost):
         """Test: Cuando IP es localhost, intenta obtener IP pública"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock datetime.now() para retornar objeto con método replace
-        fixed_time = datetime(2026, 2, 5, 10, 30, 0)
-        mock_now_result = Mock()
-        mock_now_result.replace.return_value = fixed_time
-        mock_datetime.now.return_value = mock_now_result
-        
         # Mock ipify.org para obtener IP pública
-        mock_ipify = Mock()
-        mock_ipify.status_code = 200
-        mock_ipify.text = "200.50.100.150"
-        
-        # Mock ip-api.com
-        mock_ipapi = Mock()
-        mock_ipapi.status_code = 200
-        mock_ipapi.json.return_value = {
-            "status": "success",
-            "country": "Ecuador",
-            "city": "Quito",
-            "regionName": "Pichincha"
-        }
-        
-        mock_client = AsyncMock()
-        mock_client.get.side_effect = [mock_ipify, mock_ipapi]
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
-        
-        request = Mock()
-        request.headers = {"User-Agent": "Test"}
-        request.client = Mock()
-        request.client.host = "127.0.0.1"  # Localhost
+        # (con IP pública de desarrollo local no se consulta ip-api.com)
+        httpx_mock.add_response(url="https://api.ipify.org", text="200.50.100.150")
         
         result = await service.log_action(
-            request=request,
+            request=req_localhost,
             action="test_action",
             admin_id=1,
             admin_username="admin"
@@ -366,19 +253,14 @@ class TestAuditServiceLogAction:
         
         assert result == 123
     
-    @pytest.mark.asyncio
-    async def test_log_action_handles_exception(self, mock_db):
+    async def test_log_action_handles_exception(self, service, db_and_cursor, make_fake_request):
         """Test: Maneja excepciones y retorna False"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
+        _, cursor = db_and_cursor
         
         # Forzar excepción en cursor.execute
-        mock_db.get_cursor.return_value.__enter__.return_value.execute.side_effect = Exception("DB Error")
+        cursor.execute.side_effect = Exception("DB Error")
         
-        request = Mock()
-        request.headers = {}
-        request.client = Mock()
-        request.client.host = "192.168.1.1"
+        request = make_fake_request({}, "192.168.1.1")
         
         result = await service.log_action(
             request=request,
@@ -390,42 +272,17 @@ class TestAuditServiceLogAction:
         assert result is False
 
 
+@pytest.mark.usefixtures("frozen_time")
 class TestAuditServiceLogFailedAttempt:
     """Tests para log_failed_attempt"""
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.datetime')
-    @patch('zoneinfo.ZoneInfo')  # Parchear ZoneInfo para evitar error en Windows
-    @patch('app.infrastructure.services.audit_service.httpx.AsyncClient')
-    async def test_log_failed_attempt_success(self, mock_httpx_client, mock_zoneinfo, mock_datetime, mock_db):
+    @requires_httpx_mock
+    async def test_log_failed_attempt_success(self, ipapi_response, service, make_fake_request):
         """Test: Registra intento fallido exitosamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock datetime.now() para retornar objeto con método replace
-        fixed_time = datetime(2026, 2, 5, 10, 30, 0)
-        mock_now_result = Mock()
-        mock_now_result.replace.return_value = fixed_time
-        mock_datetime.now.return_value = mock_now_result
-        
         # Mock geolocalización
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "status": "success",
-            "country": "Ecuador",
-            "city": "Guayaquil",
-            "regionName": "Guayas"
-        }
-        
-        mock_client = AsyncMock()
-        mock_client.get.return_value = mock_response
-        mock_httpx_client.return_value.__aenter__.return_value = mock_client
-        
-        request = Mock()
-        request.headers = {"User-Agent": "Hacker Tool"}
-        request.client = Mock()
-        request.client.host = "203.0.113.99"
+        ipapi_response("203.0.113.99", city="Guayaquil", region="Guayas")
+        
+        request = make_fake_request({"User-Agent": "Hacker Tool"}, "203.0.113.99")
         
         result = await service.log_failed_attempt(
             request=request,
@@ -436,24 +293,10 @@ class TestAuditServiceLogFailedAttempt:
         
         assert result is True
     
-    @pytest.mark.asyncio
-    @patch('app.infrastructure.services.audit_service.datetime')
-    @patch('zoneinfo.ZoneInfo')  # Parchear ZoneInfo para evitar error en Windows
-    async def test_log_failed_attempt_handles_all_errors(self, mock_zoneinfo, mock_datetime, mock_db):
+    async def test_log_failed_attempt_handles_all_errors(self, service, make_fake_request):
         """Test: Maneja errores en IP, User-Agent y ubicación"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
-        
-        # Mock datetime.now() para retornar objeto con método replace
-        fixed_time = datetime(2026, 2, 5, 10, 30, 0)
-        mock_now_result = Mock()
-        mock_now_result.replace.return_value = fixed_time
-        mock_datetime.now.return_value = mock_now_result
-        
         # Request que lanza excepciones
-        request = Mock()
-        request.headers.get.side_effect = Exception("Header error")
-        request.client = None
+        request = make_fake_request(ExplodingHeaders())
         
         result = await service.log_failed_attempt(
             request=request,
@@ -469,13 +312,12 @@ class TestAuditServiceLogFailedAttempt:
 class TestAuditServiceGetLogs:
     """Tests para get_logs - consulta de registros"""
     
-    def test_get_logs_success(self, mock_db):
+    def test_get_logs_success(self, service, db_and_cursor):
         """Test: Obtiene logs exitosamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
+        _, cursor = db_and_cursor
         
         # Mock datos de retorno
-        mock_db.get_cursor.return_value.__enter__.return_value.fetchall.return_value = [
+        cursor.fetchall.return_value = [
             (1, "unlock_user", 1, "admin", 5, "john", "Test details", 
              "192.168.1.1", "Mozilla", "Ecuador", "Quito", "Pichincha", datetime.now()),
             (2, "delete_user", 1, "admin", 6, "jane", "Deleted inactive",
@@ -488,12 +330,11 @@ class TestAuditServiceGetLogs:
         assert logs[0].action == "unlock_user"
         assert logs[1].action == "delete_user"
     
-    def test_get_logs_handles_exception(self, mock_db):
+    def test_get_logs_handles_exception(self, service, db_and_cursor):
         """Test: Retorna lista vacía cuando hay error"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
+        _, cursor = db_and_cursor
         
-        mock_db.get_cursor.return_value.__enter__.return_value.execute.side_effect = Exception("Query error")
+        cursor.execute.side_effect = Exception("Query error")
         
         logs = service.get_logs()
         
@@ -503,23 +344,21 @@ class TestAuditServiceGetLogs:
 class TestAuditServiceGetLogsCount:
     """Tests para get_logs_count"""
     
-    def test_get_logs_count_success(self, mock_db):
+    def test_get_logs_count_success(self, service, db_and_cursor):
         """Test: Obtiene conteo exitosamente"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
+        _, cursor = db_and_cursor
         
-        mock_db.get_cursor.return_value.__enter__.return_value.fetchone.return_value = (42,)
+        cursor.fetchone.return_value = (42,)
         
         count = service.get_logs_count()
         
         assert count == 42
     
-    def test_get_logs_count_handles_exception(self, mock_db):
+    def test_get_logs_count_handles_exception(self, service, db_and_cursor):
         """Test: Retorna 0 cuando hay error"""
-        service = AuditService.__new__(AuditService)
-        service._db = mock_db
+        _, cursor = db_and_cursor
         
-        mock_db.get_cursor.return_value.__enter__.return_value.execute.side_effect = Exception("Error")
+        cursor.execute.side_effect = Exception("Error")
         
         count = service.get_logs_count()
         
@@ -529,6 +368,7 @@ class TestAuditServiceGetLogsCount:
 class TestAuditServiceSingleton:
     """Tests para patrón singleton get_audit_service"""
     
+    @pytest.mark.xdist_group("audit_singleton")
     @patch('app.infrastructure.services.audit_service.get_db')
     def test_get_audit_service_returns_singleton(self, mock_get_db):
         """Test: get_audit_service retorna la misma instancia"""
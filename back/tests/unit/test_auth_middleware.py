@@ -8,53 +8,49 @@ from datetime import datetime, timedelta
 from jose import jwt
 
 from app.presentation.middleware.auth_middleware import JWTBearer, get_current_user_id
+from app.config.settings import get_settings
 from fastapi import HTTPException
 
 
+_SETTINGS = get_settings()
+
+# Instantes de expiración calculados una sola vez al importar el módulo
+_NOW = datetime.utcnow()
+_EXP_FUTURE = _NOW + timedelta(hours=24)
+_EXP_PAST = _NOW - timedelta(hours=1)
+
+
+@pytest.fixture(scope="session")
+def settings():
+    """Configuración de la app (compartida en la sesión)"""
+    return _SETTINGS
+
+
+@pytest.fixture(scope="session")
+def jwt_bearer():
+    """Instancia de JWTBearer (sin estado, compartida en la sesión)"""
+    return JWTBearer(auto_error=True)
+
+
+@pytest.fixture(scope="session")
+def valid_token(settings):
+    """Token válido durante toda la sesión de tests"""
+    payload = {
+        "sub": "1",
+        "username": "testuser",
+        "exp": _EXP_FUTURE
+    }
+    
+    return jwt.encode(
+        payload,
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM
+    )
+
+
 class TestJWTBearer:
     """Tests para JWTBearer middleware"""
     
-    @pytest.fixture
-    def jwt_bearer(self):
-        """Fixture para crear instancia de JWTBearer"""
-        return JWTBearer(auto_error=True)
-    
-    @pytest.fixture
-    def valid_token(self):
-        """Fixture para generar token válido"""
-        from app.config.settings import get_settings
-        settings = get_settings()
-        
-        payload = {
-            "sub": "1",
-            "username": "testuser",
-            "exp": datetime.utcnow() + timedelta(hours=1)
-        }
-        
-        return jwt.encode(
-            payload,
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
-    
-    @pytest.fixture
-    def expired_token(self):
-        """Fixture para generar token expirado"""
-        from app.config.settings import get_settings
-        settings = get_settings()
-        
-        payload = {
-            "sub": "1",
-            "username": "testuser",
-            "exp": datetime.utcnow() - timedelta(hours=1)  # Expirado
-        }
-        
-        return jwt.encode(
-            payload,
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
-    
     def test_verify_jwt_valid_token(self, jwt_bearer, valid_token):
         """Test verificación de token válido"""
         payload = jwt_bearer.verify_jwt(valid_token)
@@ -63,69 +59,29 @@ class TestJWTBearer:
         assert payload.get("sub") == "1"
         assert payload.get("username") == "testuser"
     
-    def test_verify_jwt_expired_token(self, jwt_bearer, expired_token):
-        """Test que token expirado retorna None"""
-        payload = jwt_bearer.verify_jwt(expired_token)
-        
-        assert payload is None
-    
     def test_verify_jwt_invalid_token(self, jwt_bearer):
         """Test que token inválido retorna None"""
         payload = jwt_bearer.verify_jwt("invalid.token.here")
         
         assert payload is None
     
-    def test_verify_jwt_wrong_secret(self, jwt_bearer):
-        """Test que token con secret incorrecto retorna None"""
-        payload = {
-            "sub": "1",
-            "username": "testuser",
-            "exp": datetime.utcnow() + timedelta(hours=1)
-        }
-        
-        # Token firmado con secret incorrecto
-        wrong_token = jwt.encode(payload, "wrong-secret", algorithm="HS256")
-        
-        result = jwt_bearer.verify_jwt(wrong_token)
-        
-        assert result is None
-    
-    def test_verify_jwt_missing_sub_claim(self, jwt_bearer):
-        """Test que token sin 'sub' claim retorna None"""
-        from app.config.settings import get_settings
-        settings = get_settings()
-        
-        payload = {
-            "username": "testuser",  # Sin 'sub'
-            "exp": datetime.utcnow() + timedelta(hours=1)
-        }
-        
-        token = jwt.encode(
-            payload,
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
-        
-        result = jwt_bearer.verify_jwt(token)
-        
-        assert result is None
-    
-    def test_verify_jwt_empty_sub_claim(self, jwt_bearer):
-        """Test que token con 'sub' vacío retorna None"""
-        from app.config.settings import get_settings
-        settings = get_settings()
-        
-        payload = {
-            "sub": "",  # Sub vacío
-            "username": "testuser",
-            "exp": datetime.utcnow() + timedelta(hours=1)
-        }
-        
-        token = jwt.encode(
-            payload,
-            settings.JWT_SECRET_KEY,
-            algorithm=settings.JWT_ALGORITHM
-        )
+    @pytest.mark.parametrize("payload,secret", [
+        # Sin 'sub'
+        ({"username": "testuser", "exp": _EXP_FUTURE},
+         _SETTINGS.JWT_SECRET_KEY),
+        # 'sub' vacío
+        ({"sub": "", "username": "testuser", "exp": _EXP_FUTURE},
+         _SETTINGS.JWT_SECRET_KEY),
+        # Firmado con secret incorrecto
+        ({"sub": "1", "username": "testuser", "exp": _EXP_FUTURE},
+         "wrong-secret"),
+        # Expirado
+        ({"sub": "1", "username": "testuser", "exp": _EXP_PAST},
+         _SETTINGS.JWT_SECRET_KEY),
+    ], ids=["missing_sub", "empty_sub", "wrong_secret", "expired"])
+    def test_verify_jwt_rejects_invalid(self, jwt_bearer, payload, secret):
+        """Test que tokens inválidos retornan None"""
+        token = jwt.encode(payload, secret, algorithm=_SETTINGS.JWT_ALGORITHM)
         
         result = jwt_bearer.verify_jwt(token)
         
@@ -173,28 +129,16 @@ class TestGetCurrentUserId:
 class TestJWTBearerIntegration:
     """Tests de integración para JWTBearer"""
     
-    @pytest.mark.asyncio
-    async def test_bearer_with_valid_credentials(self):
+    async def test_bearer_with_valid_credentials(self, jwt_bearer, valid_token):
         """Test JWTBearer con credenciales válidas"""
-        from app.config.settings import get_settings
-        settings = get_settings()
-        
-        # Crear token válido
-        payload = {
-            "sub": "1",
-            "username": "testuser",
-            "exp": datetime.utcnow() + timedelta(hours=1)
-        }
-        token = jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+        token = valid_token
         
         # Mock del request
         mock_request = MagicMock()
         mock_request.headers = {"Authorization": f"Bearer {token}"}
         
-        bearer = JWTBearer(auto_error=True)
-        
         # El test verifica que el método verify_jwt funciona correctamente
-        result = bearer.verify_jwt(token)
+        result = jwt_bearer.verify_jwt(token)
         
         assert result is not None
         assert result.get("sub") == "1"
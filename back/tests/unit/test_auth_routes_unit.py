@@ -1,96 +1,12 @@
 """
 Tests unitarios para rutas de autenticación
 """
-import pytest
-from unittest.mock import Mock, MagicMock, patch
-from fastapi import HTTPException
-from datetime import datetime, timedelta
 
-from app.presentation.routes.auth_routes import router
-from app.application.dto.user_dto import RegisterRequest, LoginRequest
-from app.domain.entities.user import User, UserRole
 
+def test_auth_routes_importable():
+    """Smoke test: el router de auth y BackupCodeService se importan correctamente"""
+    from app.presentation.routes import auth_routes
+    from app.application.use_cases.backup_code_service import BackupCodeService
 
-class TestAuthRoutesUnit:
-    """Tests unitarios para funciones de rutas de auth"""
-    
-    @patch('app.presentation.routes.auth_routes.get_user_repository')
-    @patch('app.presentation.routes.auth_routes.RegisterUserUseCase')
-    def test_register_creates_user(self, mock_use_case_class, mock_repo):
-        """Test que register llama al use case correctamente"""
-        # Arrange
-        mock_use_case = Mock()
-        mock_use_case_class.return_value = mock_use_case
-        mock_use_case.execute.return_value = (
-            True,
-            User(id=1, username="newuser", email="new@test.com", password_hash="hash"),
-            "Usuario registrado exitosamente"
-        )
-        
-        # No podemos llamar directamente a la función async sin FastAPI context
-        # Solo verificamos que los mocks están configurados
-        assert mock_use_case_class is not None
-    
-    @patch('app.presentation.routes.auth_routes.get_user_repository')
-    @patch('app.presentation.routes.auth_routes.LoginUserUseCase')
-    def test_login_calls_use_case(self, mock_use_case_class, mock_repo):
-        """Test que login llama al use case correctamente"""
-        # Arrange
-        mock_use_case = Mock()
-        mock_use_case_class.return_value = mock_use_case
-        mock_use_case.execute.return_value = (
-            True,
-            "token123",
-            {"user_id": 1, "role": "user"},
-            "Login exitoso"
-        )
-        
-        # Solo verificamos configuración
-        assert mock_use_case_class is not None
-
-
-class TestBackupCodeRoutes:
-    """Tests para rutas de códigos de respaldo"""
-    
-    def test_backup_code_service_exists(self):
-        """Test que BackupCodeService puede ser importado"""
-        from app.application.use_cases.backup_code_service import BackupCodeService
-        assert BackupCodeService is not None
-        
-    def test_backup_code_service_initialization(self):
-        """Test que BackupCodeService se puede inicializar con repositorio"""
-        from app.application.use_cases.backup_code_service import BackupCodeService
-        mock_repo = Mock()
-        service = BackupCodeService(mock_repo)
-        assert service is not None
-
-
-class TestPasswordChangeRoutes:
-    """Tests para cambio de contraseña"""
-    
-    @patch('app.presentation.routes.auth_routes.get_user_repository')
-    def test_change_password_requires_user(self, mock_repo):
-        """Test que cambio de password verifica usuario"""
-        mock_repo_instance = Mock()
-        mock_repo.return_value = mock_repo_instance
-        mock_repo_instance.find_by_id.return_value = None
-        
-        # Verificar configuración
-        assert mock_repo_instance is not None
-
-
-class TestLogoutRoutes:
-    """Tests para logout"""
-    
-    @patch('app.presentation.routes.auth_routes.get_user_repository')
-    def test_logout_clears_session(self, mock_repo):
-        """Test que logout limpia sesión"""
-        mock_repo_instance = Mock()
-        mock_repo.return_value = mock_repo_instance
-        
-        user = User(id=1, username="test", password_hash="hash")
-        user.active_session_token = "old_token"
-        mock_repo_instance.find_by_id.return_value = user
-        
-        # Verificar que user puede actualizarse
-        assert user.active_session_token is not None
+    assert auth_routes.router
+    assert BackupCodeService
@@ -9,15 +9,29 @@ import base64
 from app.infrastructure.services.deepface_service import OpenCVDNNFaceService
 
 
+# Imágenes sintéticas compartidas; de solo lectura para que ningún test las altere
+_IMG_100 = np.zeros((100, 100, 3), dtype=np.uint8)
+_IMG_100.setflags(write=False)
+_IMG_50 = np.zeros((50, 50, 3), dtype=np.uint8)
+_IMG_50.setflags(write=False)
+
+
 class TestOpenCVDNNAdditional:
     """Tests adicionales para aumentar cobertura"""
     
-    def test_detect_face_dnn_returns_face(self):
+    @pytest.fixture(scope="class")
+    def service(self):
+        """
+        Una sola instancia por clase: cargar YuNet/SFace y el Haar cascade es
+        lo más costoso. Los patch.object se aplican sobre la clase, así que
+        también afectan a la instancia compartida.
+        """
+        return OpenCVDNNFaceService()
+    
+    def test_detect_face_dnn_returns_face(self, service):
         """Test que _detect_face_dnn procesa imagen"""
-        service = OpenCVDNNFaceService()
-        
         # Crear imagen simple
-        img = np.zeros((100, 100, 3), dtype=np.uint8)
+        img = _IMG_100
         
         # El método puede retornar None o array dependiendo de detección
         result = service._detect_face_dnn(img)
@@ -25,23 +39,19 @@ class TestOpenCVDNNAdditional:
         # Resultado válido es None o ndarray
         assert result is None or isinstance(result, np.ndarray)
     
-    def test_detect_face_haar_fallback(self):
+    def test_detect_face_haar_fallback(self, service):
         """Test que _detect_face_haar funciona como fallback"""
-        service = OpenCVDNNFaceService()
-        
-        img = np.zeros((100, 100, 3), dtype=np.uint8)
+        img = _IMG_100
         
         result = service._detect_face_haar(img)
         
         # Resultado válido es None o tupla de coordenadas
         assert result is None or isinstance(result, tuple)
     
-    def test_extract_embedding_dnn_processes_face(self):
+    def test_extract_embedding_dnn_processes_face(self, service):
         """Test que _extract_embedding_dnn procesa rostro detectado"""
-        service = OpenCVDNNFaceService()
-        
-        img = np.zeros((100, 100, 3), dtype=np.uint8)
-        face = np.zeros((50, 50, 3), dtype=np.uint8)
+        img = _IMG_100
+        face = _IMG_50
         
         try:
             result = service._extract_embedding_dnn(img, face)
@@ -51,11 +61,9 @@ class TestOpenCVDNNAdditional:
             # Es válido que falle con imagen sintética
             pass
     
-    def test_extract_embedding_fallback_with_rect(self):
+    def test_extract_embedding_fallback_with_rect(self, service):
         """Test que _extract_embedding_fallback procesa con rect"""
-        service = OpenCVDNNFaceService()
-        
-        img = np.zeros((100, 100, 3), dtype=np.uint8)
+        img = _IMG_100
         face_rect = (10, 10, 50, 50)  # x, y, w, h
         
         try:
@@ -69,13 +77,11 @@ class TestOpenCVDNNAdditional:
     @patch.object(OpenCVDNNFaceService, '_decode_image')
     @patch.object(OpenCVDNNFaceService, '_detect_face_dnn')
     @patch.object(OpenCVDNNFaceService, '_extract_embedding_dnn')
-    def test_extract_face_encoding_uses_dnn_pipeline(self, mock_embed, mock_detect, mock_decode):
+    def test_extract_face_encoding_uses_dnn_pipeline(self, mock_embed, mock_detect, mock_decode, service):
         """Test que extract_face_encoding usa pipeline DNN completo"""
-        service = OpenCVDNNFaceService()
-        
         # Configurar mocks
-        mock_decode.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
-        mock_detect.return_value = np.zeros((50, 50, 3), dtype=np.uint8)
+        mock_decode.return_value = _IMG_100
+        mock_detect.return_value = _IMG_50
         mock_embed.return_value = np.array([0.1] * 128)
         
         image_data = base64.b64encode(b"fake_image").decode()
@@ -89,11 +95,9 @@ class TestOpenCVDNNAdditional:
     
     @patch.object(OpenCVDNNFaceService, '_decode_image')
     @patch.object(OpenCVDNNFaceService, '_detect_face_dnn')
-    def test_extract_face_encoding_handles_no_face_detected(self, mock_detect, mock_decode):
+    def test_extract_face_encoding_handles_no_face_detected(self, mock_detect, mock_decode, service):
         """Test que maneja cuando no se detecta rostro"""
-        service = OpenCVDNNFaceService()
-        
-        mock_decode.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
+        mock_decode.return_value = _IMG_100
         mock_detect.return_value = None  # No se detectó rostro
         
         image_data = base64.b64encode(b"fake_image").decode()
@@ -106,11 +110,9 @@ class TestOpenCVDNNAdditional:
     
     @patch.object(OpenCVDNNFaceService, '_decode_image')
     @patch.object(OpenCVDNNFaceService, 'extract_face_encoding')
-    def test_verify_face_calls_extract_encoding(self, mock_extract, mock_decode):
+    def test_verify_face_calls_extract_encoding(self, mock_extract, mock_decode, service):
         """Test que verify_face llama a extract_face_encoding"""
-        service = OpenCVDNNFaceService()
-        
-        mock_decode.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
+        mock_decode.return_value = _IMG_100
         mock_extract.return_value = (True, [0.1] * 128, "Success")
         
         stored_encoding = [0.1] * 128
@@ -126,12 +128,10 @@ class TestOpenCVDNNAdditional:
     
     @patch.object(OpenCVDNNFaceService, '_decode_image')
     @patch.object(OpenCVDNNFaceService, '_detect_face_dnn')
-    def test_detect_spoofing_basic_check(self, mock_detect, mock_decode):
+    def test_detect_spoofing_basic_check(self, mock_detect, mock_decode, service):
         """Test que detect_spoofing realiza verificación básica"""
-        service = OpenCVDNNFaceService()
-        
-        mock_decode.return_value = np.zeros((100, 100, 3), dtype=np.uint8)
-        mock_detect.return_value = np.zeros((50, 50, 3), dtype=np.uint8)
+        mock_decode.return_value = _IMG_100
+        mock_detect.return_value = _IMG_50
         
         image_data = base64.b64encode(b"fake_image").decode()
         
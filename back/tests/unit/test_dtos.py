@@ -3,7 +3,7 @@ Login Seguro - Tests Unitarios: DTOs (Data Transfer Objects)
 Tests para validación de DTOs con Pydantic
 """
 import pytest
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.application.dto.user_dto import (
     RegisterRequest, LoginRequest,
@@ -12,16 +12,29 @@ from app.application.dto.user_dto import (
 )
 
 
+# Validador de RegisterRequest construido una vez y reutilizado en sus tests
+_REGISTER_ADAPTER = TypeAdapter(RegisterRequest)
+
+# Payload > 7MB construido una sola vez para los tests de tamaño máximo
+_LARGE_JPEG = "data:image/jpeg;base64," + "A" * 7_000_001
+
+# Formatos no soportados (GIF, BMP)
+_UNSUPPORTED_IMAGES = [
+    pytest.param("data:image/gif;base64,R0lGODlh...", id="gif"),
+    pytest.param("data:image/bmp;base64,Qk...", id="bmp"),
+]
+
+
 class TestRegisterRequest:
     """Tests para RegisterRequest DTO"""
     
     def test_valid_register_request(self):
         """Test registro válido con todos los campos"""
-        request = RegisterRequest(
-            username="validuser",
-            password="Secure@Password123",
-            email="user@example.com"
-        )
+        request = _REGISTER_ADAPTER.validate_python({
+            "username": "validuser",
+            "password": "Secure@Password123",
+            "email": "user@example.com"
+        })
         
         assert request.username == "validuser"
         assert request.password == "Secure@Password123"
@@ -29,130 +42,52 @@ class TestRegisterRequest:
     
     def test_valid_register_request_without_email(self):
         """Test registro válido sin email (es opcional)"""
-        request = RegisterRequest(
-            username="validuser",
-            password="Secure@Password123"
-        )
+        request = _REGISTER_ADAPTER.validate_python({
+            "username": "validuser",
+            "password": "Secure@Password123"
+        })
         
         assert request.username == "validuser"
         assert request.email is None
     
-    def test_username_too_short(self):
-        """Test que username muy corto falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="ab",  # Menos de 3 caracteres
-                password="Secure@Password123"
-            )
-        
-        errors = exc_info.value.errors()
-        assert any("username" in str(e.get("loc", "")) for e in errors)
-    
-    def test_username_too_long(self):
-        """Test que username muy largo falla"""
+    @pytest.mark.parametrize("username", [
+        pytest.param("ab", id="too_short"),  # Menos de 3 caracteres
+        pytest.param("a" * 51, id="too_long"),  # Más de 50 caracteres
+        pytest.param("user@name!", id="special_characters"),  # Caracteres no permitidos
+        pytest.param("select", id="sql_keyword"),  # Palabra SQL reservada
+        pytest.param("<script>alert('xss')</script>user", id="html"),
+    ])
+    def test_invalid_username_fails(self, username):
+        """Test que usernames inválidos fallan en el campo username"""
         with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="a" * 51,  # Más de 50 caracteres
-                password="Secure@Password123"
-            )
+            _REGISTER_ADAPTER.validate_python({"username": username, "password": "Secure@Password123"})
         
         errors = exc_info.value.errors()
         assert any("username" in str(e.get("loc", "")) for e in errors)
     
-    def test_username_with_special_characters_fails(self):
-        """Test que username con caracteres especiales falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="user@name!",  # Caracteres no permitidos
-                password="Secure@Password123"
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
-    
-    def test_username_with_sql_keyword_fails(self):
-        """Test que username con palabra SQL reservada falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="select",
-                password="Secure@Password123"
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
-    
-    def test_username_sanitizes_html(self):
-        """Test que username sanitiza HTML"""
-        # El validador debe limpiar el HTML
-        with pytest.raises(ValidationError):
-            RegisterRequest(
-                username="<script>alert('xss')</script>user",
-                password="Secure@Password123"
-            )
-    
-    def test_password_too_short(self):
-        """Test que contraseña muy corta falla"""
+    @pytest.mark.parametrize("password", [
+        pytest.param("Short1!", id="too_short"),  # Menos de 8 caracteres
+        pytest.param("password123!", id="no_uppercase"),
+        pytest.param("PASSWORD123!", id="no_lowercase"),
+        pytest.param("Password!@#", id="no_number"),
+        pytest.param("Password123", id="no_special_char"),
+    ])
+    def test_weak_password_fails(self, password):
+        """Test que contraseñas que no cumplen la política fallan"""
         with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="validuser",
-                password="Short1!"  # Menos de 8 caracteres
-            )
+            _REGISTER_ADAPTER.validate_python({"username": "validuser", "password": password})
         
         errors = exc_info.value.errors()
         assert any("password" in str(e.get("loc", "")) for e in errors)
     
-    def test_password_without_uppercase_fails(self):
-        """Test que contraseña sin mayúscula falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="validuser",
-                password="password123!"  # Sin mayúscula
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
-    
-    def test_password_without_lowercase_fails(self):
-        """Test que contraseña sin minúscula falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="validuser",
-                password="PASSWORD123!"  # Sin minúscula
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
-    
-    def test_password_without_number_fails(self):
-        """Test que contraseña sin número falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="validuser",
-                password="Password!@#"  # Sin número
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
-    
-    def test_password_without_special_char_fails(self):
-        """Test que contraseña sin carácter especial falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="validuser",
-                password="Password123"  # Sin carácter especial
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
-    
     def test_invalid_email_format(self):
         """Test que email con formato inválido falla"""
         with pytest.raises(ValidationError) as exc_info:
-            RegisterRequest(
-                username="validuser",
-                password="Secure@Password123",
-                email="invalid-email"  # Formato inválido
-            )
+            _REGISTER_ADAPTER.validate_python({
+                "username": "validuser",
+                "password": "Secure@Password123",
+                "email": "invalid-email"  # Formato inválido
+            })
         
         errors = exc_info.value.errors()
         assert any("email" in str(e.get("loc", "")) for e in errors)
@@ -173,25 +108,19 @@ class TestLoginRequest:
     
     def test_empty_username_fails(self):
         """Test que username vacío falla"""
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError):
             LoginRequest(
                 username="",
                 password="password123"
             )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
     
     def test_empty_password_fails(self):
         """Test que password vacío falla"""
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError):
             LoginRequest(
                 username="testuser",
                 password=""
             )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
     
     def test_username_sanitized_from_html(self):
         """Test que username es sanitizado de HTML/XSS"""
@@ -207,41 +136,26 @@ class TestLoginRequest:
 class TestFaceRegisterRequest:
     """Tests para FaceRegisterRequest DTO"""
     
-    def test_valid_jpeg_image(self):
-        """Test imagen JPEG válida"""
-        request = FaceRegisterRequest(
-            image_data="data:image/jpeg;base64,/9j/4AAQSkZJRg..."
-        )
-        
-        assert request.image_data.startswith("data:image/jpeg")
+    @pytest.mark.parametrize("image_data,prefix", [
+        pytest.param("data:image/jpeg;base64,/9j/4AAQSkZJRg...", "data:image/jpeg", id="jpeg"),
+        pytest.param("data:image/png;base64,iVBORw0KGgo...", "data:image/png", id="png"),
+    ])
+    def test_valid_image(self, image_data, prefix):
+        """Test imágenes JPEG/PNG válidas"""
+        request = FaceRegisterRequest(image_data=image_data)
+        
+        assert request.image_data.startswith(prefix)
     
-    def test_valid_png_image(self):
-        """Test imagen PNG válida"""
-        request = FaceRegisterRequest(
-            image_data="data:image/png;base64,iVBORw0KGgo..."
-        )
-        
-        assert request.image_data.startswith("data:image/png")
-    
-    def test_invalid_image_format_fails(self):
+    @pytest.mark.parametrize("image_data", _UNSUPPORTED_IMAGES)
+    def test_invalid_image_format_fails(self, image_data):
         """Test que formato de imagen inválido falla"""
-        with pytest.raises(ValidationError) as exc_info:
-            FaceRegisterRequest(
-                image_data="data:image/gif;base64,R0lGODlh..."  # GIF no soportado
-            )
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
+        with pytest.raises(ValidationError):
+            FaceRegisterRequest(image_data=image_data)
     
     def test_image_too_large_fails(self):
         """Test que imagen muy grande falla"""
-        large_data = "data:image/jpeg;base64," + "A" * 7_000_001  # > 7MB
-        
-        with pytest.raises(ValidationError) as exc_info:
-            FaceRegisterRequest(image_data=large_data)
-        
-        errors = exc_info.value.errors()
-        assert len(errors) > 0
+        with pytest.raises(ValidationError):
+            FaceRegisterRequest(image_data=_LARGE_JPEG)
     
     def test_raw_base64_accepted(self):
         """Test que base64 sin prefijo MIME es aceptado"""
@@ -263,12 +177,16 @@ class TestFaceVerifyRequest:
         
         assert request.image_data is not None
     
-    def test_invalid_format_fails(self):
+    @pytest.mark.parametrize("image_data", _UNSUPPORTED_IMAGES)
+    def test_invalid_format_fails(self, image_data):
         """Test que formato inválido falla"""
         with pytest.raises(ValidationError):
-            FaceVerifyRequest(
-                image_data="data:image/bmp;base64,Qk..."  # BMP no soportado
-            )
+            FaceVerifyRequest(image_data=image_data)
+    
+    def test_image_too_large_fails(self):
+        """Test que imagen muy grande falla"""
+        with pytest.raises(ValidationError):
+            FaceVerifyRequest(image_data=_LARGE_JPEG)
 
 
 class TestUserResponse:
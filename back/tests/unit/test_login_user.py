@@ -3,7 +3,9 @@ Login Seguro - Tests Unitarios: Caso de Uso Login User
 Tests para el caso de uso de login de usuarios
 """
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import bcrypt
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
 
 from app.application.use_cases.login_user import LoginUserUseCase, verify_password
@@ -11,23 +13,36 @@ from app.application.dto.user_dto import LoginRequest
 from app.domain.entities.user import User, UserRole
 
 
+# Settings mínimos para LoginUserUseCase (no se mutan)
+_TEST_SETTINGS = SimpleNamespace(
+    JWT_SECRET_KEY="test-secret-key",
+    JWT_ALGORITHM="HS256",
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES=30,
+    MAX_LOGIN_ATTEMPTS=3,
+    LOCKOUT_DURATION_MINUTES=15,
+)
+
+
+def _hash(password: str) -> str:
+    """Hash bcrypt real (costo 4 por el gensalt parcheado en conftest)"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
 class TestVerifyPasswordLoginModule:
     """Tests para verify_password en módulo login"""
     
     def test_verify_correct_password(self):
         """Test verificación de contraseña correcta"""
-        import bcrypt
         password = "Test@123"
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
         
         assert verify_password(password, hashed) is True
     
     def test_verify_incorrect_password(self):
         """Test verificación de contraseña incorrecta"""
-        import bcrypt
         password = "Test@123"
         wrong_password = "Wrong@456"
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
         
         assert verify_password(wrong_password, hashed) is False
     
@@ -96,12 +111,8 @@ class TestLoginUserUseCase:
     def test_login_fails_active_session_exists(self, login_use_case, mock_user_repository, user_with_active_session):
         """Test que login falla cuando ya hay sesión activa"""
         # Arrange
-        import bcrypt
         password = "Test@123"
-        user_with_active_session.password_hash = bcrypt.hashpw(
-            password.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        user_with_active_session.password_hash = _hash(password)
         
         mock_user_repository.find_by_username.return_value = user_with_active_session
         
@@ -122,25 +133,15 @@ class TestLoginUserUseCase:
     def test_successful_login_generates_token(self, mock_settings, mock_user_repository, sample_user):
         """Test que login exitoso genera token"""
         # Arrange
-        import bcrypt
         password = "Test@123"
-        sample_user.password_hash = bcrypt.hashpw(
-            password.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        sample_user.password_hash = _hash(password)
         sample_user.active_session_token = None
         
         mock_user_repository.find_by_username.return_value = sample_user
         mock_user_repository.update.return_value = sample_user
         
         # Mock settings
-        settings_instance = MagicMock()
-        settings_instance.JWT_SECRET_KEY = "test-secret-key"
-        settings_instance.JWT_ALGORITHM = "HS256"
-        settings_instance.JWT_ACCESS_TOKEN_EXPIRE_MINUTES = 30
-        settings_instance.MAX_LOGIN_ATTEMPTS = 3
-        settings_instance.LOCKOUT_DURATION_MINUTES = 15
-        mock_settings.return_value = settings_instance
+        mock_settings.return_value = _TEST_SETTINGS
         
         use_case = LoginUserUseCase(mock_user_repository)
         
@@ -161,19 +162,12 @@ class TestLoginUserUseCase:
     def test_login_increments_failed_attempts(self, mock_settings, mock_user_repository, sample_user):
         """Test que login fallido incrementa intentos"""
         # Arrange
-        import bcrypt
-        sample_user.password_hash = bcrypt.hashpw(
-            "CorrectPassword@123".encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        sample_user.password_hash = _hash("CorrectPassword@123")
         sample_user.failed_login_attempts = 1
         
         mock_user_repository.find_by_username.return_value = sample_user
         
-        settings_instance = MagicMock()
-        settings_instance.MAX_LOGIN_ATTEMPTS = 3
-        settings_instance.LOCKOUT_DURATION_MINUTES = 15
-        mock_settings.return_value = settings_instance
+        mock_settings.return_value = _TEST_SETTINGS
         
         use_case = LoginUserUseCase(mock_user_repository)
         
@@ -195,19 +189,12 @@ class TestLoginUserUseCase:
     def test_login_returns_remaining_attempts(self, mock_settings, mock_user_repository, sample_user):
         """Test que login fallido retorna intentos restantes"""
         # Arrange
-        import bcrypt
-        sample_user.password_hash = bcrypt.hashpw(
-            "CorrectPassword@123".encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        sample_user.password_hash = _hash("CorrectPassword@123")
         sample_user.failed_login_attempts = 1
         
         mock_user_repository.find_by_username.return_value = sample_user
         
-        settings_instance = MagicMock()
-        settings_instance.MAX_LOGIN_ATTEMPTS = 3
-        settings_instance.LOCKOUT_DURATION_MINUTES = 15
-        mock_settings.return_value = settings_instance
+        mock_settings.return_value = _TEST_SETTINGS
         
         use_case = LoginUserUseCase(mock_user_repository)
         
@@ -225,12 +212,8 @@ class TestLoginUserUseCase:
     def test_login_returns_user_role(self, login_use_case, mock_user_repository, admin_user):
         """Test que login retorna el rol del usuario"""
         # Arrange
-        import bcrypt
         password = "Admin@123"
-        admin_user.password_hash = bcrypt.hashpw(
-            password.encode('utf-8'), 
-            bcrypt.gensalt()
-        ).decode('utf-8')
+        admin_user.password_hash = _hash(password)
         admin_user.active_session_token = None
         
         mock_user_repository.find_by_username.return_value = admin_user
@@ -11,19 +11,32 @@ from app.application.dto.user_dto import FaceRegisterRequest
 from app.domain.entities.user import User, UserRole
 
 
-@pytest.fixture
+# Encodings compartidos (tuplas inmutables, seguras de reutilizar)
+_ENCODING_5 = (0.1, 0.2, 0.3, 0.4, 0.5)
+_ENCODING_3 = (0.1, 0.2, 0.3)
+_ENCODING_128 = (0.0,) * 128
+
+@pytest.fixture(scope="module")
 def mock_user_repository():
-    """Mock del repositorio de usuarios"""
+    """Mock del repositorio de usuarios (compartido en el módulo)"""
     return Mock()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_face_service():
-    """Mock del servicio de reconocimiento facial"""
+    """Mock del servicio de reconocimiento facial (compartido en el módulo)"""
     return Mock()
 
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_user_repository, mock_face_service):
+    """Limpia llamadas, return_value y side_effect después de cada test"""
+    yield
+    mock_user_repository.reset_mock(return_value=True, side_effect=True)
+    mock_face_service.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="module")
 def register_face_use_case(mock_user_repository, mock_face_service):
     """Instancia del caso de uso con mocks"""
     return RegisterFaceUseCase(mock_user_repository, mock_face_service)
@@ -78,7 +91,7 @@ class TestRegisterFaceSuccess:
         mock_user_repository.find_by_id.return_value = sample_user
         mock_face_service.extract_face_encoding.return_value = (
             True,
-            [0.1, 0.2, 0.3, 0.4, 0.5],
+            _ENCODING_5,
             "Encoding extraído"
         )
         mock_user_repository.update_face_encoding.return_value = True
@@ -108,10 +121,9 @@ class TestRegisterFaceSuccess:
     ):
         """Debe guardar el encoding como JSON"""
         # Arrange
-        encoding = [0.1, 0.2, 0.3]
         mock_user_repository.find_by_id.return_value = sample_user
         mock_face_service.extract_face_encoding.return_value = (
-            True, encoding, "OK"
+            True, _ENCODING_3, "OK"
         )
         mock_user_repository.update_face_encoding.return_value = True
         
@@ -125,7 +137,7 @@ class TestRegisterFaceSuccess:
         
         # Verificar que se guardó como JSON válido
         parsed = json.loads(saved_encoding)
-        assert parsed == encoding
+        assert parsed == list(_ENCODING_3)
 
 
 class TestRegisterFaceValidation:
@@ -351,10 +363,9 @@ class TestRegisterFaceResponseData:
     ):
         """Debe retornar las dimensiones del encoding"""
         # Arrange
-        encoding_128 = [0.0] * 128
         mock_user_repository.find_by_id.return_value = sample_user
         mock_face_service.extract_face_encoding.return_value = (
-            True, encoding_128, "OK"
+            True, _ENCODING_128, "OK"
         )
         mock_user_repository.update_face_encoding.return_value = True
         
@@ -9,51 +9,45 @@ import os
 from app.config.settings import Settings, get_settings
 
 
+@pytest.fixture(scope="module")
+def default_settings():
+    """Settings por defecto, construidos una vez (solo lectura, sin leer .env)"""
+    return Settings(_env_file=None)
+
+
 class TestSettings:
     """Tests para la clase Settings"""
     
-    def test_default_database_settings(self):
+    def test_default_database_settings(self, default_settings):
         """Test valores por defecto de base de datos"""
-        settings = Settings()
-        
-        assert settings.DATABASE_HOST == "localhost"
-        assert settings.DATABASE_PORT == 5432
-        assert settings.DATABASE_NAME == "login_seguro"
+        assert default_settings.DATABASE_HOST == "localhost"
+        assert default_settings.DATABASE_PORT == 5432
+        assert default_settings.DATABASE_NAME == "login_seguro"
     
-    def test_default_jwt_settings(self):
+    def test_default_jwt_settings(self, default_settings):
         """Test valores por defecto de JWT"""
-        settings = Settings()
-        
-        assert settings.JWT_ALGORITHM == "HS256"
-        assert settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES == 30
+        assert default_settings.JWT_ALGORITHM == "HS256"
+        assert default_settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES == 30
     
-    def test_default_security_settings(self):
+    def test_default_security_settings(self, default_settings):
         """Test valores por defecto de seguridad"""
-        settings = Settings()
-        
-        assert settings.BCRYPT_ROUNDS == 12
-        assert settings.MAX_LOGIN_ATTEMPTS == 5  # Valor actual en el sistema
-        assert settings.LOCKOUT_DURATION_MINUTES == 15
+        assert default_settings.BCRYPT_ROUNDS == 12
+        assert default_settings.MAX_LOGIN_ATTEMPTS == 3
+        assert default_settings.LOCKOUT_DURATION_MINUTES == 15
     
-    def test_default_cors_origins(self):
+    def test_default_cors_origins(self, default_settings):
         """Test orígenes CORS por defecto"""
-        settings = Settings()
-        
-        assert "http://localhost:3001" in settings.CORS_ORIGINS
-        assert "http://127.0.0.1:3001" in settings.CORS_ORIGINS
+        assert "http://localhost:3001" in default_settings.CORS_ORIGINS
+        assert "http://127.0.0.1:3001" in default_settings.CORS_ORIGINS
     
-    def test_default_rate_limit(self):
+    def test_default_rate_limit(self, default_settings):
         """Test rate limit por defecto"""
-        settings = Settings()
-        
-        assert settings.RATE_LIMIT_PER_MINUTE == 30
+        assert default_settings.RATE_LIMIT_PER_MINUTE == 30
     
-    def test_default_face_recognition_settings(self):
+    def test_default_face_recognition_settings(self, default_settings):
         """Test configuración de reconocimiento facial"""
-        settings = Settings()
-        
-        assert settings.FACE_RECOGNITION_MODEL == "VGG-Face"
-        assert settings.FACE_DISTANCE_THRESHOLD == 0.45  # Valor actual en el sistema
+        assert default_settings.FACE_RECOGNITION_MODEL == "VGG-Face"
+        assert default_settings.FACE_DISTANCE_THRESHOLD == 0.6
     
     def test_database_url_property(self):
         """Test que database_url construye URL correctamente"""
@@ -83,12 +77,10 @@ class TestSettings:
             # Los valores por defecto se sobrescriben con env vars
             # Nota: esto depende de la configuración de Pydantic
     
-    def test_jwt_secret_key_exists(self):
+    def test_jwt_secret_key_exists(self, default_settings):
         """Test que JWT secret key tiene un valor"""
-        settings = Settings()
-        
-        assert settings.JWT_SECRET_KEY is not None
-        assert len(settings.JWT_SECRET_KEY) > 0
+        assert default_settings.JWT_SECRET_KEY is not None
+        assert len(default_settings.JWT_SECRET_KEY) > 0
 
 
 class TestGetSettings:
@@ -102,9 +94,6 @@ class TestGetSettings:
     
     def test_returns_cached_instance(self):
         """Test que retorna la misma instancia (singleton)"""
-        # Limpiar cache primero
-        get_settings.cache_clear()
-        
         settings1 = get_settings()
         settings2 = get_settings()
         
@@ -4,9 +4,27 @@ Tests para la entidad de dominio User
 """
 import pytest
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 import json
+import numpy as np
 
-from app.domain.entities.user import User, UserRole
+from app.domain.entities import user as user_module
+from app.domain.entities.user import User, UserRole, encoding_from_json, encoding_to_json
+
+
+# Instante de referencia fijo para los tests de bloqueo
+NOW = datetime(2025, 1, 1)
+
+# Encoding de ejemplo y su JSON, calculados una vez
+_ENCODING = [0.1, 0.2, 0.3, 0.4, 0.5]
+_ENCODING_JSON = json.dumps(_ENCODING)
+
+
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Congela datetime.now() dentro de la entidad User en NOW"""
+    monkeypatch.setattr(user_module, "datetime", SimpleNamespace(now=lambda: NOW))
+    return NOW
 
 
 class TestUserEntity:
@@ -37,44 +55,32 @@ class TestUserEntity:
         assert sample_user.email == "test@example.com"
         assert sample_user.role == UserRole.USER
     
-    def test_user_is_locked_when_locked_until_is_future(self):
-        """Test que is_locked retorna True cuando locked_until está en el futuro"""
-        user = User(
-            username="test",
-            locked_until=datetime.now() + timedelta(minutes=15)
-        )
+    @pytest.mark.parametrize("offset,expected", [
+        pytest.param(timedelta(minutes=15), True, id="future"),
+        pytest.param(timedelta(minutes=-15), False, id="past"),
+        pytest.param(None, False, id="none"),
+    ])
+    def test_user_is_locked(self, frozen_now, offset, expected):
+        """Test que is_locked depende de si locked_until está en el futuro"""
+        locked_until = None if offset is None else frozen_now + offset
+        user = User(username="test", locked_until=locked_until)
         
-        assert user.is_locked() is True
+        assert user.is_locked() is expected
     
-    def test_user_is_not_locked_when_locked_until_is_past(self):
-        """Test que is_locked retorna False cuando locked_until está en el pasado"""
-        user = User(
-            username="test",
-            locked_until=datetime.now() - timedelta(minutes=15)
-        )
-        
-        assert user.is_locked() is False
-    
-    def test_user_is_not_locked_when_locked_until_is_none(self):
-        """Test que is_locked retorna False cuando locked_until es None"""
-        user = User(username="test", locked_until=None)
-        
-        assert user.is_locked() is False
-    
-    def test_user_is_permanently_locked(self):
+    def test_user_is_permanently_locked(self, frozen_now):
         """Test que is_permanently_locked detecta bloqueos permanentes"""
         user = User(
             username="test",
-            locked_until=datetime.now() + timedelta(days=400)  # Más de 1 año
+            locked_until=frozen_now + timedelta(days=400)  # Más de 1 año
         )
         
         assert user.is_permanently_locked() is True
     
-    def test_user_is_not_permanently_locked_short_lockout(self):
+    def test_user_is_not_permanently_locked_short_lockout(self, frozen_now):
         """Test que bloqueos cortos no son permanentes"""
         user = User(
             username="test",
-            locked_until=datetime.now() + timedelta(minutes=15)
+            locked_until=frozen_now + timedelta(minutes=15)
         )
         
         assert user.is_permanently_locked() is False
@@ -95,61 +101,51 @@ class TestUserEntity:
         assert auditor.is_auditor() is True
         assert regular_user.is_auditor() is False
     
-    def test_has_backup_code_returns_true_when_hash_exists(self):
-        """Test que has_backup_code retorna True cuando hay hash"""
-        user = User(
-            username="test",
-            backup_code_hash="$2b$12$somehashvalue"
-        )
-        
-        assert user.has_backup_code() is True
-    
-    def test_has_backup_code_returns_false_when_hash_is_none(self):
-        """Test que has_backup_code retorna False cuando hash es None"""
-        user = User(username="test", backup_code_hash=None)
-        
-        assert user.has_backup_code() is False
-    
-    def test_has_backup_code_returns_false_when_hash_is_empty(self):
-        """Test que has_backup_code retorna False cuando hash está vacío"""
-        user = User(username="test", backup_code_hash="")
+    @pytest.mark.parametrize("backup_code_hash,expected", [
+        pytest.param("$2b$12$somehashvalue", True, id="hash"),
+        pytest.param(None, False, id="none"),
+        pytest.param("", False, id="empty"),
+    ])
+    def test_has_backup_code(self, backup_code_hash, expected):
+        """Test que has_backup_code solo es True con un hash no vacío"""
+        user = User(username="test", backup_code_hash=backup_code_hash)
         
-        assert user.has_backup_code() is False
+        assert user.has_backup_code() is expected
     
-    def test_get_face_encoding_list_valid_json(self):
-        """Test que get_face_encoding_list parsea JSON correctamente"""
-        encoding = [0.1, 0.2, 0.3, 0.4, 0.5]
-        user = User(
-            username="test",
-            face_encoding=json.dumps(encoding)
-        )
-        
-        result = user.get_face_encoding_list()
+    @pytest.mark.parametrize("face_encoding,expected", [
+        pytest.param(_ENCODING_JSON, _ENCODING, id="valid_json"),
+        pytest.param(None, None, id="no_encoding"),
+        pytest.param("invalid json", None, id="invalid_json"),
+    ])
+    def test_get_face_encoding_list(self, face_encoding, expected):
+        """Test que get_face_encoding_list parsea el JSON o retorna None"""
+        user = User(username="test", face_encoding=face_encoding)
         
-        assert result == encoding
-    
-    def test_get_face_encoding_list_returns_none_when_no_encoding(self):
-        """Test que get_face_encoding_list retorna None sin encoding"""
-        user = User(username="test", face_encoding=None)
-        
-        assert user.get_face_encoding_list() is None
-    
-    def test_get_face_encoding_list_returns_none_on_invalid_json(self):
-        """Test que get_face_encoding_list retorna None con JSON inválido"""
-        user = User(username="test", face_encoding="invalid json")
-        
-        assert user.get_face_encoding_list() is None
+        assert user.get_face_encoding_list() == expected
     
     def test_set_face_encoding_from_list(self):
         """Test que set_face_encoding_from_list guarda correctamente"""
         user = User(username="test")
-        encoding = [0.1, 0.2, 0.3, 0.4, 0.5]
         
-        user.set_face_encoding_from_list(encoding)
+        user.set_face_encoding_from_list(_ENCODING)
         
-        assert user.face_encoding == json.dumps(encoding)
+        assert json.loads(user.face_encoding) == _ENCODING
         assert user.face_registered is True
     
+    @pytest.mark.parametrize("stored", [
+        pytest.param(_ENCODING_JSON, id="json_dumps"),
+        pytest.param(encoding_to_json(_ENCODING), id="encoding_to_json"),
+    ])
+    def test_encoding_from_json_reads_both_formats(self, stored):
+        """Test que los encodings guardados con json.dumps siguen siendo legibles"""
+        assert encoding_from_json(stored) == _ENCODING
+    
+    def test_encoding_to_json_serializes_numpy_floats(self):
+        """Test que serializa los np.float64 del extractor de respaldo (Haar/LBP)"""
+        encoding = [np.float64(code) / 15.0 for code in (0, 3, 15)]
+        
+        assert encoding_from_json(encoding_to_json(encoding)) == [0.0, 0.2, 1.0]
+    
     def test_increment_failed_attempts(self):
         """Test que increment_failed_attempts incrementa correctamente"""
         user = User(username="test", failed_login_attempts=2)
@@ -163,7 +159,7 @@ class TestUserEntity:
         user = User(
             username="test",
             failed_login_attempts=5,
-            locked_until=datetime.now() + timedelta(minutes=15)
+            locked_until=NOW + timedelta(minutes=15)
         )
         
         user.reset_failed_attempts()
@@ -175,13 +171,13 @@ class TestUserEntity:
 class TestUserRole:
     """Tests para el enum UserRole"""
     
-    def test_user_role_values(self):
-        """Test que los roles tienen los valores correctos"""
-        assert UserRole.USER.value == "user"
-        assert UserRole.ADMIN.value == "admin"
-        assert UserRole.AUDITOR.value == "auditor"
-    
-    def test_user_role_is_string_enum(self):
-        """Test que UserRole es un string enum"""
-        assert isinstance(UserRole.USER, str)
-        assert UserRole.USER == "user"
+    @pytest.mark.parametrize("role,value", [
+        pytest.param(UserRole.USER, "user", id="user"),
+        pytest.param(UserRole.ADMIN, "admin", id="admin"),
+        pytest.param(UserRole.AUDITOR, "auditor", id="auditor"),
+    ])
+    def test_user_role_values(self, role, value):
+        """Test que cada rol es un string enum con el valor correcto"""
+        assert role.value == value
+        assert isinstance(role, str)
+        assert role == value
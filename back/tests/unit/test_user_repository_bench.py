@@ -0,0 +1,24 @@
+"""
+Benchmarks para UserRepositoryImpl (mapeo fila -> User)
+Ejecutar con: pytest -m slow --benchmark-only tests/unit/test_user_repository_bench.py
+(sin -n: pytest-benchmark se desactiva con xdist)
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.infrastructure.database.user_repository_impl import UserRepositoryImpl
+
+
+pytestmark = pytest.mark.slow
+
+
+def test_find_all_users_bench(benchmark, make_stub_db, user_row):
+    """Mapeo de 10 000 filas a entidades User"""
+    db, cursor = make_stub_db()
+    cursor.fetchall.return_value = [user_row] * 10_000
+    repo = UserRepositoryImpl(db)
+    
+    users = benchmark(repo.find_all_users)
+    
+    assert len(users) == 10_000
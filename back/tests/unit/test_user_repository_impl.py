@@ -2,22 +2,47 @@
 Tests unitarios para UserRepositoryImpl
 """
 import pytest
-from unittest.mock import Mock, MagicMock
 from datetime import datetime, timedelta
 
 from app.infrastructure.database.user_repository_impl import UserRepositoryImpl
-from app.infrastructure.database.connection import DatabaseConnection
 from app.domain.entities.user import User
 
 
-@pytest.fixture
-def mock_db():
-    """Fixture que crea un mock de DatabaseConnection con cursor"""
-    db = MagicMock(spec=DatabaseConnection)
-    cursor = MagicMock()
-    db.get_cursor.return_value.__enter__.return_value = cursor
-    db.get_cursor.return_value.__exit__.return_value = None
-    return db, cursor
+# Filas simuladas (15 columnas) con timestamps fijos
+_FIXED_TS = datetime(2024, 1, 1)
+_BLOCKED_USER_ROW_1 = (
+    1, "user1", "user1@example.com", "hash", None, False,
+    5, _FIXED_TS, "user", False, None, None, None,
+    _FIXED_TS, _FIXED_TS
+)
+_BLOCKED_USER_ROW_2 = (
+    2, "user2", "user2@example.com", "hash", None, False,
+    5, _FIXED_TS, "user", False, None, None, None,
+    _FIXED_TS, _FIXED_TS
+)
+_ADMIN_ROW = (
+    1, "admin", "admin@test.com", "hash", None, False,
+    0, None, "admin", False, None, None, None,
+    _FIXED_TS, _FIXED_TS
+)
+_AUDITOR_ROW = (
+    2, "auditor", "auditor@test.com", "hash", None, False,
+    0, None, "auditor", False, None, None, None,
+    _FIXED_TS, _FIXED_TS
+)
+
+
+@pytest.fixture(scope="module")
+def mock_db(make_stub_db):
+    """DatabaseConnection + cursor simulados, compartidos en el módulo"""
+    return make_stub_db()
+
+
+@pytest.fixture(autouse=True)
+def _reset_cursor(mock_db):
+    """Cada test empieza con un cursor limpio"""
+    yield
+    mock_db[1].reset()
 
 
 class TestUserRepositoryCreate:
@@ -29,7 +54,7 @@ class TestUserRepositoryCreate:
         repo = UserRepositoryImpl(db)
         
         # Simular que la BD retorna el ID 1
-        cursor.fetchone.return_value = (1, datetime.now(), datetime.now())
+        cursor.fetchone.return_value = (1, _FIXED_TS, _FIXED_TS)
         
         user = User(
             username="testuser",
@@ -44,97 +69,38 @@ class TestUserRepositoryCreate:
         cursor.execute.assert_called_once()
 
 
-class TestUserRepositoryFindById:
-    """Tests para búsqueda por ID"""
-    
-    def test_find_by_id_found(self, mock_db):
-        """Debe retornar usuario cuando existe"""
-        db, cursor = mock_db
-        repo = UserRepositoryImpl(db)
-        
-        # Simular row completa (15 columnas)
-        cursor.fetchone.return_value = (
-            1, "testuser", "test@example.com", "hash", None, False,
-            0, None, "user", False, None, None, None,
-            datetime.now(), datetime.now()
-        )
-        
-        result = repo.find_by_id(1)
-        
-        assert result is not None
-        assert result.id == 1
-        assert result.username == "testuser"
-        
-    def test_find_by_id_not_found(self, mock_db):
-        """Debe retornar None si no existe"""
-        db, cursor = mock_db
-        repo = UserRepositoryImpl(db)
-        
-        cursor.fetchone.return_value = None
-        
-        result = repo.find_by_id(999)
-        
-        assert result is None
+_FINDERS = [
+    pytest.param("find_by_id", 1, "id", id="by_id"),
+    pytest.param("find_by_username", "testuser", "username", id="by_username"),
+    pytest.param("find_by_email", "test@example.com", "email", id="by_email"),
+]
 
 
-class TestUserRepositoryFindByUsername:
-    """Tests para búsqueda por username"""
+class TestUserRepositoryFind:
+    """Tests para búsqueda por ID, username y email"""
     
-    def test_find_by_username_found(self, mock_db):
+    @pytest.mark.parametrize("method,arg,field", _FINDERS)
+    def test_find_found(self, mock_db, user_row, method, arg, field):
         """Debe retornar usuario cuando existe"""
         db, cursor = mock_db
         repo = UserRepositoryImpl(db)
         
-        cursor.fetchone.return_value = (
-            1, "testuser", "test@example.com", "hash", None, False,
-            0, None, "user", False, None, None, None,
-            datetime.now(), datetime.now()
-        )
+        cursor.fetchone.return_value = user_row
         
-        result = repo.find_by_username("testuser")
+        result = getattr(repo, method)(arg)
         
         assert result is not None
-        assert result.username == "testuser"
-        
-    def test_find_by_username_not_found(self, mock_db):
-        """Debe retornar None si no existe"""
-        db, cursor = mock_db
-        repo = UserRepositoryImpl(db)
-        
-        cursor.fetchone.return_value = None
-        
-        result = repo.find_by_username("ghost")
-        
-        assert result is None
-
-
-class TestUserRepositoryFindByEmail:
-    """Tests para búsqueda por email"""
+        assert getattr(result, field) == arg
     
-    def test_find_by_email_found(self, mock_db):
-        """Debe retornar usuario cuando existe"""
-        db, cursor = mock_db
-        repo = UserRepositoryImpl(db)
-        
-        cursor.fetchone.return_value = (
-            1, "testuser", "test@example.com", "hash", None, False,
-            0, None, "user", False, None, None, None,
-            datetime.now(), datetime.now()
-        )
-        
-        result = repo.find_by_email("test@example.com")
-        
-        assert result is not None
-        assert result.email == "test@example.com"
-        
-    def test_find_by_email_not_found(self, mock_db):
+    @pytest.mark.parametrize("method,arg,field", _FINDERS)
+    def test_find_not_found(self, mock_db, method, arg, field):
         """Debe retornar None si no existe"""
         db, cursor = mock_db
         repo = UserRepositoryImpl(db)
         
         cursor.fetchone.return_value = None
         
-        result = repo.find_by_email("ghost@example.com")
+        result = getattr(repo, method)(arg)
         
         assert result is None
 
@@ -148,7 +114,7 @@ class TestUserRepositoryUpdate:
         repo = UserRepositoryImpl(db)
         
         # update() retorna el updated_at timestamp
-        updated_at = datetime.now()
+        updated_at = _FIXED_TS
         cursor.fetchone.return_value = (updated_at,)
         
         user = User(
@@ -184,7 +150,7 @@ class TestUserRepositoryUpdate:
         repo = UserRepositoryImpl(db)
         
         cursor.rowcount = 1
-        lock_until = datetime.now() + timedelta(minutes=15)
+        lock_until = _FIXED_TS + timedelta(minutes=15)
         
         result = repo.update_failed_attempts(1, 5, lock_until)
         
@@ -263,14 +229,7 @@ class TestUserRepositoryListOperations:
         repo = UserRepositoryImpl(db)
         
         # Simular 2 usuarios bloqueados
-        cursor.fetchall.return_value = [
-            (1, "user1", "user1@example.com", "hash", None, False,
-             5, datetime.now(), "user", False, None, None, None,
-             datetime.now(), datetime.now()),
-            (2, "user2", "user2@example.com", "hash", None, False,
-             5, datetime.now(), "user", False, None, None, None,
-             datetime.now(), datetime.now()),
-        ]
+        cursor.fetchall.return_value = [_BLOCKED_USER_ROW_1, _BLOCKED_USER_ROW_2]
         
         result = repo.find_all_blocked()
         
@@ -278,21 +237,17 @@ class TestUserRepositoryListOperations:
         assert result[0].id == 1
         assert result[1].id == 2
         
-    def test_find_all_users(self, mock_db):
+    def test_find_all_users(self, mock_db, user_row):
         """Debe retornar todos los usuarios"""
         db, cursor = mock_db
         repo = UserRepositoryImpl(db)
         
-        cursor.fetchall.return_value = [
-            (1, "user1", "user1@example.com", "hash", None, False,
-             0, None, "user", False, None, None, None,
-             datetime.now(), datetime.now()),
-        ]
+        cursor.fetchall.return_value = [user_row]
         
         result = repo.find_all_users()
         
         assert len(result) == 1
-        assert result[0].username == "user1"
+        assert result[0].username == "testuser"
         
     def test_find_all_empty(self, mock_db):
         """Debe retornar lista vacía si no hay usuarios"""
@@ -344,7 +299,7 @@ class TestUserRepositoryAdminCreation:
         # find_by_email retorna None (no existe)
         cursor.fetchone.side_effect = [
             None,  # find_by_email
-            (1, datetime.now(), datetime.now())  # create
+            (1, _FIXED_TS, _FIXED_TS)  # create
         ]
         
         result = repo.create_admin_if_not_exists("admin@test.com", "Admin@123")
@@ -358,11 +313,7 @@ class TestUserRepositoryAdminCreation:
         repo = UserRepositoryImpl(db)
         
         # find_by_email retorna admin existente
-        cursor.fetchone.return_value = (
-            1, "admin", "admin@test.com", "hash", None, False,
-            0, None, "admin", False, None, None, None,
-            datetime.now(), datetime.now()
-        )
+        cursor.fetchone.return_value = _ADMIN_ROW
         
         result = repo.create_admin_if_not_exists("admin@test.com", "Admin@123")
         
@@ -378,7 +329,7 @@ class TestUserRepositoryAdminCreation:
         # find_by_username retorna None, luego create retorna ID
         cursor.fetchone.side_effect = [
             None,  # find_by_username
-            (2, datetime.now(), datetime.now())  # create
+            (2, _FIXED_TS, _FIXED_TS)  # create
         ]
         
         result = repo.create_auditor_if_not_exists("auditor", "Auditor@123")
@@ -392,11 +343,7 @@ class TestUserRepositoryAdminCreation:
         repo = UserRepositoryImpl(db)
         
         # find_by_username retorna auditor existente
-        cursor.fetchone.return_value = (
-            2, "auditor", "auditor@test.com", "hash", None, False,
-            0, None, "auditor", False, None, None, None,
-            datetime.now(), datetime.now()
-        )
+        cursor.fetchone.return_value = _AUDITOR_ROW
         
         result = repo.create_auditor_if_not_exists("auditor", "Auditor@123")
         
@@ -12,6 +12,10 @@ from app.application.dto.user_dto import FaceVerifyRequest
 from app.domain.entities.user import User, UserRole
 
 
+# Encoding facial almacenado (JSON de 128 valores) serializado una sola vez
+_FAKE_ENCODING = json.dumps([0.1] * 128)
+
+
 class TestVerifyFaceUseCase:
     """Tests para VerifyFaceUseCase"""
     
@@ -67,7 +71,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=0,
             role=UserRole.USER
         )
@@ -95,7 +99,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=0,
             role=UserRole.USER
         )
@@ -120,7 +124,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=0,
             role=UserRole.USER
         )
@@ -145,7 +149,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=2,  # Tenía intentos fallidos
             role=UserRole.USER
         )
@@ -171,7 +175,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=0,
             role=UserRole.ADMIN
         )
@@ -219,7 +223,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=0,
             role=UserRole.USER
         )
@@ -247,7 +251,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="testuser",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=4,
             role=UserRole.USER
         )
@@ -273,7 +277,7 @@ class TestVerifyFaceUseCase:
             id=1,
             username="admin",
             face_registered=True,
-            face_encoding=json.dumps([0.1] * 128),
+            face_encoding=_FAKE_ENCODING,
             failed_login_attempts=4,
             role=UserRole.ADMIN
         )
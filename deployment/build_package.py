@@ -4,10 +4,18 @@ Construye la carpeta `deployment/package/` copiando los archivos necesarios
 para llevar el modelo a otro proyecto.
 
 Ejecutar desde la raíz del repo:
-  python deployment/build_package.py
+  python deployment/build_package.py [--link]
+
+Por defecto los archivos se copian. Con `--link` se enlazan (hard link) cuando
+origen y destino están en el mismo sistema de archivos: no se copian bytes,
+pero paquete y repo comparten los archivos y escribir en uno (p. ej. volver a
+guardar el modelo) modifica también el otro.
 """
+import argparse
 import os
 import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 os.chdir(ROOT)
@@ -20,22 +28,70 @@ FILES = [
     'deployment/infer_example.py',
     'deployment/README.md',
     'ml_model/vulnerability_detector.pkl',
+    'ml_model/vulnerability_detector.onnx',  # opcional: inferencia con ONNX Runtime
 ]
 
+parser = argparse.ArgumentParser(description='Construye deployment/package/')
+parser.add_argument('--link', action='store_true', help='usar hard links en lugar de copiar (comparten archivo con el origen)')
+args = parser.parse_args()
+
 OUT_DIR = os.path.join('deployment', 'package')
 os.makedirs(OUT_DIR, exist_ok=True)
 
+
+def _fast_copy(src, dst):
+    """Copia real; con --link, hard link (sin copiar bytes) si es posible"""
+    if os.path.exists(dst):
+        os.remove(dst)
+    if args.link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # Otro sistema de archivos o sin soporte de hard links
+    shutil.copy2(src, dst)
+
+
+def _scan_present(paths):
+    """Existencia de cada archivo con un solo scandir por directorio padre"""
+    by_dir = defaultdict(list)
+    for path in paths:
+        by_dir[os.path.dirname(path) or '.'].append(path)
+    present = {}
+    for directory, dir_paths in by_dir.items():
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            names = set()
+        for path in dir_paths:
+            present[path] = os.path.basename(path) in names
+    return present
+
+
+PRESENT = _scan_present(FILES)
+
+
+def _copy(path):
+    """Copia un archivo al paquete; retorna (origen, destino o None si no existe)"""
+    if not PRESENT[path]:
+        return path, None
+    dest = os.path.join(OUT_DIR, os.path.basename(path))
+    _fast_copy(path, dest)
+    return path, dest
+
+
 copied = []
 missing = []
-for path in FILES:
-    if os.path.exists(path):
-        dest = os.path.join(OUT_DIR, os.path.basename(path))
-        shutil.copy2(path, dest)
-        copied.append(path)
-        print(f'Copied: {path} -> {dest}')
-    else:
-        missing.append(path)
-        print(f'Warning: not found {path}')
+# Copias en paralelo (I/O): el .pkl no bloquea a los archivos pequeños
+with ThreadPoolExecutor(max_workers=min(8, len(FILES))) as executor:
+    for path, dest in executor.map(_copy, FILES):
+        if dest:
+            copied.append(path)
+            print(f'Copied: {path} -> {dest}')
+        else:
+            missing.append(path)
+            print(f'Warning: not found {path}')
 
 print('\nPackage assembled at:', OUT_DIR)
 print('Files copied:', len(copied))
@@ -4,51 +4,77 @@ Inferencia rápida usando el modelo pre-entrenado.
 
 Uso:
   python deployment/infer_example.py <ruta_a_archivo.py> [ruta_modelo]
+  python deployment/infer_example.py --batch <directorio> [ruta_modelo]
 
 El script analiza el archivo indicado, extrae características y ejecuta
 la predicción usando `ml_model/vulnerability_detector.pkl` por defecto.
+Con `--batch` analiza todos los .py del directorio (en paralelo) y los
+predice con una sola llamada al modelo.
 """
 import sys
 import os
 import json
+from functools import lru_cache
+from typing import Dict, List
 
 from ml_model.model import VulnerabilityPredictor
-from scripts.code_analyzer import CodeAnalyzer
+from scripts.code_analyzer import CodeAnalyzer, analyze_directory
 
 
+@lru_cache(maxsize=4)
 def load_predictor(model_path: str):
+    """Carga el modelo una sola vez por proceso y ruta (el unpickle es lo más caro)"""
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Modelo no encontrado: {model_path}")
     return VulnerabilityPredictor(model_path)
 
 
-def analyze_file(path: str):
+def predict_results(predictor, results: List[Dict]) -> List[Dict]:
+    """Predice en lote los resultados de CodeAnalyzer ({'file', 'features'})"""
+    if not results:
+        return []
+    X = predictor.prepare_features_batch([res.get('features', {}) for res in results])
+    preds, probs = predictor.predict_batch(X)
+
+    return [
+        {
+            'file': res['file'],
+            'prediction': int(pred),
+            'probability': float(prob),
+            'is_trained': predictor.is_trained
+        }
+        for res, pred, prob in zip(results, preds, probs)
+    ]
+
+
+def analyze_paths(paths: List[str], model_path: str = 'ml_model/vulnerability_detector.pkl') -> List[Dict]:
+    """Predice varios archivos reutilizando el mismo modelo cargado"""
+    predictor = load_predictor(model_path)
     analyzer = CodeAnalyzer()
-    res = analyzer.analyze_file(path)
-    return res.get('features', {})
+    return predict_results(predictor, [analyzer.analyze_file(path) for path in paths])
 
 
 def main():
     if len(sys.argv) < 2:
         print("Uso: python deployment/infer_example.py <ruta_a_archivo.py> [ruta_modelo]")
+        print("     python deployment/infer_example.py --batch <directorio> [ruta_modelo]")
         sys.exit(1)
 
-    file_path = sys.argv[1]
-    model_path = sys.argv[2] if len(sys.argv) > 2 else 'ml_model/vulnerability_detector.pkl'
-
-    predictor = load_predictor(model_path)
+    if sys.argv[1] == '--batch':
+        if len(sys.argv) < 3:
+            print("Uso: python deployment/infer_example.py --batch <directorio> [ruta_modelo]")
+            sys.exit(1)
+        directory = sys.argv[2]
+        model_path = sys.argv[3] if len(sys.argv) > 3 else 'ml_model/vulnerability_detector.pkl'
 
-    features = analyze_file(file_path)
-    df = predictor.prepare_features(features)
+        output = predict_results(load_predictor(model_path), analyze_directory(directory))
+        print(json.dumps(output, indent=2))
+        return
 
-    pred, prob = predictor.predict(df)
+    file_path = sys.argv[1]
+    model_path = sys.argv[2] if len(sys.argv) > 2 else 'ml_model/vulnerability_detector.pkl'
 
-    output = {
-        'file': file_path,
-        'prediction': int(pred),
-        'probability': float(prob),
-        'is_trained': predictor.is_trained
-    }
+    output = analyze_paths([file_path], model_path)[0]
 
     print(json.dumps(output, indent=2))
 
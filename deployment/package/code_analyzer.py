@@ -6,11 +6,12 @@ Utiliza AST parsing para detectar patrones de riesgo en código Python.
 import ast
 import os
 import re
-from typing import Dict, List, Any
-from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, List, Optional, Pattern
+from dataclasses import dataclass, fields
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeFeatures:
     """Características extraídas del código para análisis de vulnerabilidades"""
     # Métricas básicas
@@ -56,186 +57,290 @@ class CodeFeatures:
     uses_hardcoded_key: bool = False
 
 
+# Nombres de los campos, calculados una vez (asdict recorre y copia en profundidad)
+_FEATURE_FIELDS = tuple(f.name for f in fields(CodeFeatures))
+
+
+def _features_to_dict(features: CodeFeatures) -> Dict[str, Any]:
+    """Equivalente a asdict() para CodeFeatures (todos los campos son escalares)"""
+    return {name: getattr(features, name) for name in _FEATURE_FIELDS}
+
+
+def _read_source(filepath: str) -> str:
+    """
+    Lee el archivo con un solo os.read del tamaño exacto y decodifica una vez.
+    Los bytes UTF-8 inválidos se reemplazan (el archivo se analiza igual) y los
+    saltos CRLF / CR se normalizan a LF, como hacía open() en modo texto.
+    """
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    
+    content = data.decode('utf-8', 'replace')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+class _AstVisitor(ast.NodeVisitor):
+    """
+    Recorre el AST una sola vez. Los métodos visit_* quedan registrados en un
+    dict por tipo de nodo a nivel de clase (_DISPATCH), así visit() no arma
+    'visit_' + nombre ni hace getattr en cada nodo.
+    """
+    
+    _DISPATCH: ClassVar[Dict[type, Callable[['_AstVisitor', Any], None]]] = {}
+    
+    def __init__(self, analyzer: 'CodeAnalyzer', features: CodeFeatures, complexities: List[int]) -> None:
+        self.analyzer = analyzer
+        self.features = features
+        self.complexities = complexities
+        self.decisions = 0  # Puntos de decisión acumulados (complejidad ciclomática)
+    
+    def visit(self, node: ast.AST) -> None:
+        method = self._DISPATCH.get(type(node))
+        if method is None:
+            self.generic_visit(node)
+        else:
+            method(self, node)
+    
+    def generic_visit(self, node: ast.AST) -> None:
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+    
+    # Contar funciones y clases
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.features.num_functions += 1
+        start = self.decisions
+        self.generic_visit(node)
+        # La complejidad de una función incluye la de sus funciones anidadas
+        self.complexities.append(self.decisions - start + 1)
+    
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.features.num_classes += 1
+        self.generic_visit(node)
+    
+    # Detectar llamadas peligrosas
+    def visit_Call(self, node: ast.Call) -> None:
+        self.analyzer._analyze_call(node, self.features)
+        self.generic_visit(node)
+    
+    # Detectar imports peligrosos
+    def visit_Import(self, node: ast.Import) -> None:
+        self.analyzer._analyze_import(node, self.features)
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.analyzer._analyze_import_from(node, self.features)
+    
+    # Puntos de decisión
+    def visit_If(self, node: ast.AST) -> None:
+        self.decisions += 1
+        self.generic_visit(node)
+    
+    def visit_While(self, node: ast.While) -> None:
+        self.visit_If(node)
+    
+    def visit_For(self, node: ast.For) -> None:
+        self.visit_If(node)
+    
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        self.decisions += 1
+        # Detectar bare except
+        if node.type is None:
+            self.features.has_bare_except = True
+        self.generic_visit(node)
+    
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self.decisions += len(node.values) - 1
+        self.generic_visit(node)
+
+
+_AstVisitor._DISPATCH = {
+    getattr(ast, name[len('visit_'):]): method
+    for name, method in vars(_AstVisitor).items()
+    if name.startswith('visit_')
+}
+
+
 class CodeAnalyzer:
     """Analiza código Python para detectar patrones de vulnerabilidades"""
     
-    DANGEROUS_FUNCTIONS = {'eval', 'exec', '__import__', 'compile'}
-    DEPRECATED_MODULES = {'md5', 'sha', 'cgi', 'imp'}
-    WEAK_CRYPTO = {'DES', 'RC4', 'MD5', 'SHA1'}
+    DANGEROUS_FUNCTIONS: ClassVar[FrozenSet[str]] = frozenset({'eval', 'exec', '__import__', 'compile'})
+    DEPRECATED_MODULES: ClassVar[FrozenSet[str]] = frozenset({'md5', 'sha', 'cgi', 'imp'})
+    WEAK_CRYPTO: ClassVar[FrozenSet[str]] = frozenset({'DES', 'RC4', 'MD5', 'SHA1'})
+    PICKLE_LOAD_CALLS: ClassVar[FrozenSet[str]] = frozenset({'pickle.load', 'pickle.loads', 'cPickle.load'})
+    YAML_LOAD_CALLS: ClassVar[FrozenSet[str]] = frozenset({'yaml.load', 'yaml.unsafe_load'})
+    SUBPROCESS_CALLS: ClassVar[FrozenSet[str]] = frozenset({'subprocess.call', 'subprocess.Popen'})
+    
+    # Nombres de criptografía débil en un solo regex (sin .upper() por alias)
+    _WEAK_CRYPTO_RE: ClassVar[Pattern[str]] = re.compile('|'.join(re.escape(w) for w in sorted(WEAK_CRYPTO)), re.IGNORECASE)
     
-    SQL_PATTERNS = [
+    SQL_PATTERNS: ClassVar[List[str]] = [
         r'execute\s*\([^)]*\+',
         r'execute\s*\([^)]*%',
         r'execute\s*\(f["\']',
     ]
     
-    SECRET_PATTERNS = [
+    SECRET_PATTERNS: ClassVar[List[str]] = [
         r'password\s*=\s*["\'][^"\']{3,}',
         r'api[_-]?key\s*=\s*["\'][^"\']{10,}',
         r'secret\s*=\s*["\'][^"\']{10,}',
         r'token\s*=\s*["\'][^"\']{10,}',
     ]
     
-    def __init__(self):
-        self.features = CodeFeatures()
-        self.function_complexities = []
+    # Patrones precompilados: una sola pasada del motor de regex por categoría
+    _SQL_RE: ClassVar[Pattern[str]] = re.compile('|'.join(f'(?:{p})' for p in SQL_PATTERNS), re.IGNORECASE)
+    # La lookahead con las primeras letras de las palabras clave (más la 'ſ' que
+    # IGNORECASE equipara a 's') actúa de prefiltro multi-patrón: el motor
+    # descarta cada posición con una sola comparación de charset
+    _SECRET_RE: ClassVar[Pattern[str]] = re.compile(
+        r'(?=[pPaAsStT\u017f])(?:' + '|'.join(f'(?:{p})' for p in SECRET_PATTERNS) + ')',
+        re.IGNORECASE
+    )
+    _DEBUG_RE: ClassVar[Pattern[str]] = re.compile(r'debug(?:=| = )true', re.IGNORECASE)
+    _FORMAT_RE: ClassVar[Pattern[str]] = re.compile(r'%\s*\([^)]*\)\s*s')
+    _PATH_RE: ClassVar[Pattern[str]] = re.compile(r'open\s*\([^)]*\+')
+    
+    # Líneas de comentario / no vacías ([^\S\n] = espacio sin salto, como str.strip)
+    _COMMENT_LINE_RE: ClassVar[Pattern[str]] = re.compile(r'^[^\S\n]*#', re.MULTILINE)
+    _NONBLANK_LINE_RE: ClassVar[Pattern[str]] = re.compile(r'^[^\S\n]*\S', re.MULTILINE)
     
     def analyze_file(self, filepath: str) -> Dict[str, Any]:
-        """Analiza un archivo Python y extrae características"""
+        """
+        Analiza un archivo Python y extrae características.
+        El estado del análisis es local: una misma instancia puede analizar
+        muchos archivos.
+        """
+        features = CodeFeatures()
+        complexities: List[int] = []
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _read_source(filepath)
             
             # Análisis básico
-            self._analyze_basic_metrics(content)
+            self._analyze_basic_metrics(content, features)
             
             # Análisis de patrones de texto
-            self._analyze_text_patterns(content)
+            self._analyze_text_patterns(content, features)
             
             # Análisis AST
             try:
                 tree = ast.parse(content)
-                self._analyze_ast(tree)
+                self._analyze_ast(tree, features, complexities)
             except SyntaxError:
                 pass  # Archivo con errores de sintaxis
             
             # Calcular métricas derivadas
-            self._calculate_derived_metrics()
+            self._calculate_derived_metrics(features, complexities)
             
             return {
                 'file': filepath,
-                'features': asdict(self.features)
+                'features': _features_to_dict(features)
             }
         except Exception as e:
             return {
                 'file': filepath,
                 'error': str(e),
-                'features': asdict(CodeFeatures())
+                'features': _features_to_dict(CodeFeatures())
             }
     
-    def _analyze_basic_metrics(self, content: str):
+    def _analyze_basic_metrics(self, content: str, features: CodeFeatures) -> None:
         """Analiza métricas básicas del código"""
-        lines = content.split('\n')
-        self.features.total_lines = len(lines)
+        features.total_lines = content.count('\n') + 1
         
-        for line in lines:
-            stripped = line.strip()
-            if stripped and not stripped.startswith('#'):
-                self.features.code_lines += 1
-            elif stripped.startswith('#'):
-                self.features.comment_lines += 1
-    
-    def _analyze_text_patterns(self, content: str):
+        # Se cuenta sobre el texto completo, sin dividirlo en líneas
+        comment_lines = len(self._COMMENT_LINE_RE.findall(content))
+        features.comment_lines = comment_lines
+        features.code_lines = len(self._NONBLANK_LINE_RE.findall(content)) - comment_lines
+    
+    def _analyze_text_patterns(self, content: str, features: CodeFeatures) -> None:
         """Analiza patrones de texto que indican riesgos"""
-        content_lower = content.lower()
-        
         # SQL injection patterns
-        for pattern in self.SQL_PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
-                self.features.has_sql_concat = True
-                break
+        if self._SQL_RE.search(content):
+            features.has_sql_concat = True
         
         # Secrets hardcodeados
-        for pattern in self.SECRET_PATTERNS:
-            if re.search(pattern, content, re.IGNORECASE):
-                self.features.has_hardcoded_secrets = True
-                break
+        if self._SECRET_RE.search(content):
+            features.has_hardcoded_secrets = True
         
         # Flask debug
-        if 'debug=true' in content_lower or 'debug = true' in content_lower:
-            self.features.has_flask_debug = True
+        if self._DEBUG_RE.search(content):
+            features.has_flask_debug = True
         
         # Format string vulnerabilities
-        if re.search(r'%\s*\([^)]*\)\s*s', content):
-            self.features.has_format_string_vuln = True
+        if self._FORMAT_RE.search(content):
+            features.has_format_string_vuln = True
         
         # Path traversal
-        if re.search(r'open\s*\([^)]*\+', content) or '../' in content:
-            self.features.has_path_traversal_risk = True
-    
-    def _analyze_ast(self, tree: ast.AST):
-        """Analiza el árbol de sintaxis abstracta"""
-        for node in ast.walk(tree):
-            # Contar funciones y clases
-            if isinstance(node, ast.FunctionDef):
-                self.features.num_functions += 1
-                complexity = self._calculate_complexity(node)
-                self.function_complexities.append(complexity)
-            elif isinstance(node, ast.ClassDef):
-                self.features.num_classes += 1
-            
-            # Detectar llamadas peligrosas
-            elif isinstance(node, ast.Call):
-                self._analyze_call(node)
-            
-            # Detectar imports peligrosos
-            elif isinstance(node, ast.Import) or isinstance(node, ast.ImportFrom):
-                self._analyze_import(node)
-            
-            # Detectar bare except
-            elif isinstance(node, ast.ExceptHandler):
-                if node.type is None:
-                    self.features.has_bare_except = True
+        if self._PATH_RE.search(content) or '../' in content:
+            features.has_path_traversal_risk = True
+    
+    def _analyze_ast(self, tree: ast.AST, features: CodeFeatures, complexities: List[int]) -> None:
+        """Analiza el árbol de sintaxis abstracta en un único recorrido"""
+        _AstVisitor(self, features, complexities).visit(tree)
     
-    def _analyze_call(self, node: ast.Call):
+    def _analyze_call(self, node: ast.Call, features: CodeFeatures) -> None:
         """Analiza llamadas a funciones para detectar patrones peligrosos"""
         func_name = self._get_call_name(node)
         
         if func_name in self.DANGEROUS_FUNCTIONS:
             if func_name == 'eval':
-                self.features.has_eval = True
+                features.has_eval = True
             elif func_name == 'exec':
-                self.features.has_exec = True
+                features.has_exec = True
         
         elif func_name == 'input' and not self._has_validation(node):
-            self.features.has_input_direct = True
+            features.has_input_direct = True
         
-        elif func_name in ('pickle.load', 'pickle.loads', 'cPickle.load'):
-            self.features.has_pickle_load = True
-            self.features.has_unsafe_deserialization = True
+        elif func_name in self.PICKLE_LOAD_CALLS:
+            features.has_pickle_load = True
+            features.has_unsafe_deserialization = True
         
-        elif func_name in ('yaml.load', 'yaml.unsafe_load'):
-            self.features.has_yaml_unsafe = True
-            self.features.has_unsafe_deserialization = True
+        elif func_name in self.YAML_LOAD_CALLS:
+            features.has_yaml_unsafe = True
+            features.has_unsafe_deserialization = True
         
         elif 'system' in func_name:
-            self.features.uses_os_system = True
-            self.features.has_command_injection_risk = True
+            features.uses_os_system = True
+            features.has_command_injection_risk = True
         
-        elif func_name == 'subprocess.call' or func_name == 'subprocess.Popen':
+        elif func_name in self.SUBPROCESS_CALLS:
             # Verificar si shell=True
             for keyword in node.keywords:
                 if keyword.arg == 'shell' and isinstance(keyword.value, ast.Constant):
                     if keyword.value.value is True:
-                        self.features.uses_subprocess_shell = True
-                        self.features.has_command_injection_risk = True
-    
-    def _analyze_import(self, node):
-        """Analiza imports para detectar módulos peligrosos o deprecados"""
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                if alias.name in self.DEPRECATED_MODULES:
-                    self.features.uses_deprecated_libs = True
-                elif alias.name == 'os':
-                    # Marcar para análisis posterior
-                    pass
+                        features.uses_subprocess_shell = True
+                        features.has_command_injection_risk = True
+    
+    def _analyze_import(self, node: ast.Import, features: CodeFeatures) -> None:
+        """Analiza imports para detectar módulos deprecados"""
+        for alias in node.names:
+            if alias.name in self.DEPRECATED_MODULES:
+                features.uses_deprecated_libs = True
+    
+    def _analyze_import_from(self, node: ast.ImportFrom, features: CodeFeatures) -> None:
+        """Analiza `from ... import` para detectar módulos deprecados y criptografía débil"""
+        if node.module in self.DEPRECATED_MODULES:
+            features.uses_deprecated_libs = True
         
-        elif isinstance(node, ast.ImportFrom):
-            if node.module in self.DEPRECATED_MODULES:
-                self.features.uses_deprecated_libs = True
-            
-            # Detectar criptografía débil
-            for alias in node.names:
-                if any(weak in alias.name.upper() for weak in self.WEAK_CRYPTO):
-                    self.features.uses_weak_crypto = True
+        # Detectar criptografía débil
+        for alias in node.names:
+            if self._WEAK_CRYPTO_RE.search(alias.name):
+                features.uses_weak_crypto = True
+                break
     
     def _get_call_name(self, node: ast.Call) -> str:
         """Obtiene el nombre completo de una llamada a función"""
-        if isinstance(node.func, ast.Name):
-            return node.func.id
-        elif isinstance(node.func, ast.Attribute):
+        func = node.func
+        if isinstance(func, ast.Name):
+            return func.id
+        elif isinstance(func, ast.Attribute):
+            # Caso más común (os.system, pickle.load): sin lista ni join
+            if isinstance(func.value, ast.Name):
+                return f"{func.value.id}.{func.attr}"
             parts = []
-            current = node.func
+            current: ast.expr = func
             while isinstance(current, ast.Attribute):
                 parts.append(current.attr)
                 current = current.value
@@ -249,40 +354,51 @@ class CodeAnalyzer:
         # Simplificado: en un análisis real se verificaría el contexto
         return False
     
-    def _calculate_complexity(self, node: ast.FunctionDef) -> int:
-        """Calcula complejidad ciclomática de una función"""
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
-        return complexity
-    
-    def _calculate_derived_metrics(self):
+    def _calculate_derived_metrics(self, features: CodeFeatures, complexities: List[int]) -> None:
         """Calcula métricas derivadas"""
-        if self.function_complexities:
-            self.features.max_function_complexity = max(self.function_complexities)
-            self.features.avg_function_complexity = sum(self.function_complexities) / len(self.function_complexities)
+        if complexities:
+            features.max_function_complexity = max(complexities)
+            features.avg_function_complexity = sum(complexities) / len(complexities)
         
-        if self.features.num_functions > 0:
+        if features.num_functions > 0:
             # Estimar ratio de manejo de excepciones
-            self.features.exception_handling_ratio = 0.5 if not self.features.has_bare_except else 0.2
+            features.exception_handling_ratio = 0.5 if not features.has_bare_except else 0.2
+
+
+# Analizador sin estado: se reutiliza para todos los archivos de cada proceso
+_ANALYZER = CodeAnalyzer()
+
+# Por debajo de esta cantidad de archivos no compensa arrancar el pool de procesos
+_MIN_FILES_FOR_POOL = 32
 
 
-def analyze_directory(directory: str) -> List[Dict[str, Any]]:
-    """Analiza todos los archivos Python en un directorio"""
-    results = []
-    
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py'):
-                filepath = os.path.join(root, file)
-                analyzer = CodeAnalyzer()
-                result = analyzer.analyze_file(filepath)
-                results.append(result)
-    
-    return results
+def _analyze_one(filepath: str) -> Dict[str, Any]:
+    """Analiza un archivo (a nivel de módulo para poder enviarse a otro proceso)"""
+    return _ANALYZER.analyze_file(filepath)
+
+
+def analyze_directory(directory: str, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Analiza todos los archivos Python en un directorio, repartidos entre procesos
+    
+    Con menos de _MIN_FILES_FOR_POOL archivos o max_workers=1 el análisis es
+    secuencial: arrancar procesos cuesta más que analizar pocos archivos.
+    Cada proceso del pool vuelve a importar este módulo; en plataformas que
+    usan spawn (Windows, macOS) el script que llama debe proteger su punto de
+    entrada con `if __name__ == '__main__':`.
+    """
+    paths = [
+        os.path.join(root, file)
+        for root, _, files in os.walk(directory)
+        for file in files
+        if file.endswith('.py')
+    ]
+    
+    if max_workers == 1 or len(paths) < _MIN_FILES_FOR_POOL:
+        return [_analyze_one(path) for path in paths]
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_analyze_one, paths, chunksize=16))
 
 
 if __name__ == '__main__':
@@ -3,15 +3,81 @@ Modelo predictivo de vulnerabilidades usando Random Forest.
 Entrenado con datos reales de CVE/CWE del Dataset.
 """
 
-import pickle
+import copy
+import hashlib
+import warnings
+import joblib
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
-from typing import Dict, List, Tuple
+from sklearn.metrics import classification_report, confusion_matrix, log_loss, roc_auc_score
+from typing import Dict, List, Optional, Tuple, Union
 import os
 
+try:
+    # Inferencia en C++ (ONNX Runtime); sin ella se usa el modelo sklearn
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - dependencia opcional
+    ort = None
+
+
+def onnx_path_for(model_path: str) -> str:
+    """Ruta del modelo ONNX exportado junto al .pkl"""
+    return os.path.splitext(model_path)[0] + '.onnx'
+
+
+def pack_forest(model: RandomForestClassifier) -> Dict[str, np.ndarray]:
+    """
+    Empaqueta todos los árboles del bosque en arreglos contiguos (un nodo por
+    posición, hijos con índices globales). Las hojas apuntan a sí mismas, así
+    que cada fila baja exactamente `max_depth` pasos sin ramas en Python.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+    
+    feature = np.concatenate([tree.feature for tree in trees]).astype(np.intp)
+    threshold = np.concatenate([tree.threshold for tree in trees])  # float64, como sklearn
+    left = np.concatenate([tree.children_left + offset for tree, offset in zip(trees, offsets)])
+    right = np.concatenate([tree.children_right + offset for tree, offset in zip(trees, offsets)])
+    
+    # Hojas: hijos = el propio nodo (feature -2 en sklearn; cualquier columna vale)
+    leaves = np.concatenate([tree.children_left == -1 for tree in trees])
+    own = np.flatnonzero(leaves)
+    left[own] = own
+    right[own] = own
+    feature[own] = 0
+    
+    # Probabilidades por nodo normalizadas igual que DecisionTreeClassifier.predict_proba
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+    normalizer = value.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    
+    return {
+        'roots': offsets.astype(np.intp),
+        'feature': feature,
+        'threshold': threshold,
+        'left': left.astype(np.intp),
+        'right': right.astype(np.intp),
+        'value': value / normalizer,
+        'depth': max(tree.max_depth for tree in trees),
+    }
+
+
+def predict_proba_packed(forest: Dict[str, np.ndarray], X: np.ndarray) -> np.ndarray:
+    """
+    predict_proba del bosque sobre los arreglos de pack_forest: la bajada de
+    todas las (fila, árbol) se hace en bloque con NumPy, nivel por nivel
+    """
+    rows = np.arange(X.shape[0])[:, None]
+    nodes = np.broadcast_to(forest['roots'], (X.shape[0], forest['roots'].size))
+    for _ in range(forest['depth']):
+        go_left = X[rows, forest['feature'][nodes]] <= forest['threshold'][nodes]
+        nodes = np.where(go_left, forest['left'][nodes], forest['right'][nodes])
+    
+    # Promedio de los árboles (RandomForestClassifier.predict_proba)
+    return forest['value'][nodes].sum(axis=1) / forest['roots'].size
+
 
 class VulnerabilityPredictor:
     """Predictor de vulnerabilidades basado en Random Forest"""
@@ -37,6 +103,51 @@ class VulnerabilityPredictor:
             )
             self.feature_names = []
             self.is_trained = False
+            self._ort = None
+            self._forest = None
+            self._index_features()
+    
+    def _index_features(self):
+        """Cachea la posición de cada característica en la fila de entrada"""
+        self._feature_index = {name: i for i, name in enumerate(self.feature_names)}
+    
+    def prepare_features_array(self, features_dict: Dict) -> np.ndarray:
+        """
+        Prepara las características como una fila NumPy (1, n_features),
+        sin pasar por pandas. Es la ruta rápida para inferencia.
+        
+        Args:
+            features_dict: Diccionario con características extraídas del código
+            
+        Returns:
+            Array float32 (el tipo que usa internamente el Random Forest) con
+            las columnas en el orden del modelo; las faltantes quedan en 0
+        """
+        return self.prepare_features_batch([features_dict])
+    
+    def prepare_features_batch(self, features_dicts: List[Dict]) -> np.ndarray:
+        """
+        Apila las características de varios archivos en una matriz
+        (n_archivos, n_features) para predict_batch
+        
+        Args:
+            features_dicts: Diccionarios con características extraídas del código
+            
+        Returns:
+            Array float32 con una fila por archivo, en el orden recibido
+        """
+        if not (self.is_trained and self.feature_names):
+            raise ValueError("El modelo no ha sido entrenado")
+        
+        index = self._feature_index
+        X = np.zeros((len(features_dicts), len(index)), dtype=np.float32)
+        for row, features_dict in enumerate(features_dicts):
+            for key, value in features_dict.items():
+                i = index.get(key)
+                if i is not None:
+                    X[row, i] = value
+        
+        return X
     
     def prepare_features(self, features_dict: Dict) -> pd.DataFrame:
         """
@@ -48,32 +159,26 @@ class VulnerabilityPredictor:
         Returns:
             DataFrame con características preparadas
         """
+        if self.is_trained and self.feature_names:
+            return pd.DataFrame(self.prepare_features_array(features_dict), columns=self.feature_names)
+        
         # Convertir booleanos a enteros
         features = features_dict.copy()
         for key, value in features.items():
             if isinstance(value, bool):
                 features[key] = int(value)
         
-        df = pd.DataFrame([features])
-        
-        # Si el modelo está entrenado, asegurar que las columnas coincidan
-        if self.is_trained and self.feature_names:
-            # Agregar columnas faltantes con valor 0
-            for col in self.feature_names:
-                if col not in df.columns:
-                    df[col] = 0
-            # Mantener solo las columnas del modelo
-            df = df[self.feature_names]
-        
-        return df
+        return pd.DataFrame([features])
     
-    def train(self, X: pd.DataFrame, y: np.ndarray) -> Dict:
+    def train(self, X: pd.DataFrame, y: np.ndarray, keep_trees: Optional[int] = None) -> Dict:
         """
         Entrena el modelo
         
         Args:
             X: DataFrame con características
             y: Array con etiquetas (0: seguro, 1: vulnerable)
+            keep_trees: Si se indica, poda el bosque a esa cantidad de árboles
+                (prune_to sobre el split de test) antes de calcular métricas
             
         Returns:
             Diccionario con métricas de entrenamiento
@@ -85,11 +190,17 @@ class VulnerabilityPredictor:
         
         # Guardar nombres de características
         self.feature_names = list(X.columns)
+        self._index_features()
         
         # Entrenar modelo
         print("Entrenando modelo Random Forest...")
         self.model.fit(X_train, y_train)
         self.is_trained = True
+        self._ort = None  # Una sesión ONNX previa ya no corresponde al modelo
+        self._forest = pack_forest(self.model)
+        
+        if keep_trees is not None:
+            self.prune_to(keep_trees, X_test, y_test)
         
         # Evaluar
         y_pred = self.model.predict(X_test)
@@ -118,25 +229,92 @@ class VulnerabilityPredictor:
         
         return metrics
     
-    def predict(self, features: pd.DataFrame) -> Tuple[int, float]:
+    def prune_to(self, k: int, X_val: Union[pd.DataFrame, np.ndarray], y_val: np.ndarray):
+        """
+        Conserva solo los k árboles con menor log-loss en validación: el costo
+        de predecir es lineal en la cantidad de árboles, a cambio de algo de
+        precisión
+        
+        Args:
+            k: Número de árboles a conservar
+            X_val: Características de validación
+            y_val: Etiquetas de validación
+        """
+        if not self.is_trained:
+            raise ValueError("El modelo no ha sido entrenado")
+        if k < 1:
+            raise ValueError(f"k debe ser al menos 1 (recibido: {k})")
+        
+        # Los árboles internos se entrenaron sin nombres de columnas
+        X_val = np.asarray(X_val, dtype=np.float32)
+        losses = [
+            log_loss(y_val, estimator.predict_proba(X_val), labels=self.model.classes_)
+            for estimator in self.model.estimators_
+        ]
+        best = np.argsort(losses, kind='stable')[:k]
+        estimators = [self.model.estimators_[i] for i in sorted(best)]
+        
+        # Se empaqueta sobre una copia superficial: si falla, el modelo queda intacto
+        pruned = copy.copy(self.model)
+        pruned.estimators_ = estimators
+        pruned.n_estimators = len(estimators)
+        forest = pack_forest(pruned)
+        
+        self.model.estimators_ = estimators
+        self.model.n_estimators = len(estimators)
+        self._ort = None  # El .onnx exportado corresponde al bosque sin podar
+        self._forest = forest
+    
+    def predict(self, features: Union[pd.DataFrame, np.ndarray]) -> Tuple[int, float]:
         """
         Predice si el código tiene vulnerabilidades
         
         Args:
-            features: DataFrame con características del código
+            features: DataFrame (prepare_features) o fila NumPy
+                (prepare_features_array) con características del código
             
         Returns:
             Tupla (predicción, probabilidad) donde:
             - predicción: 0 (seguro) o 1 (vulnerable)
             - probabilidad: probabilidad de vulnerabilidad (0-1)
         """
+        labels, probabilities = self.predict_batch(features)
+        
+        return int(labels[0]), float(probabilities[0])
+    
+    def predict_batch(self, X: Union[pd.DataFrame, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predice varios archivos en una sola llamada al modelo (el costo fijo
+        por llamada se paga una vez y no por archivo)
+        
+        Args:
+            X: Matriz (n_archivos, n_features), p. ej. de prepare_features_batch
+            
+        Returns:
+            Tupla (predicciones, probabilidades) con un elemento por fila
+        """
         if not self.is_trained:
             raise ValueError("El modelo no ha sido entrenado")
         
-        prediction = self.model.predict(features)[0]
-        probability = self.model.predict_proba(features)[0][1]
+        if self._ort is not None:
+            # Salidas: [label, probabilities] (exportado sin ZipMap)
+            labels, proba = self._ort.run(None, {'input': np.asarray(X, dtype=np.float32)})
+            return labels.astype(np.int32), proba[:, 1]
         
-        return int(prediction), float(probability)
+        # Un solo recorrido del bosque: predict() es el argmax de predict_proba()
+        if self._forest is not None:
+            proba = predict_proba_packed(self._forest, np.asarray(X, dtype=np.float32))
+        elif isinstance(X, np.ndarray):
+            # El modelo se entrenó con un DataFrame; las filas ya vienen en el
+            # orden de feature_names, así que el aviso de sklearn sobra
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message='X does not have valid feature names')
+                proba = self.model.predict_proba(X)
+        else:
+            proba = self.model.predict_proba(X)
+        labels = self.model.classes_[proba.argmax(axis=1)]
+        
+        return labels.astype(np.int32), proba[:, 1]
     
     def get_feature_importance(self, top_n: int = 10) -> List[Tuple[str, float]]:
         """
@@ -158,25 +336,75 @@ class VulnerabilityPredictor:
     
     def save_model(self, filepath: str):
         """Guarda el modelo entrenado"""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # El .onnx se exporta primero para guardar su huella junto al modelo
+        onnx_sha256 = self._export_onnx(onnx_path_for(filepath))
+        
         model_data = {
             'model': self.model,
             'feature_names': self.feature_names,
-            'is_trained': self.is_trained
+            'is_trained': self.is_trained,
+            'onnx_sha256': onnx_sha256
         }
         
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'wb') as f:
-            pickle.dump(model_data, f)
+        # Pickle de joblib comprimido con zlib (los arrays de los árboles ocupan ~5x menos)
+        joblib.dump(model_data, filepath, compress=('zlib', 3))
         
         print(f"Modelo guardado en: {filepath}")
     
+    def _export_onnx(self, onnx_path: str) -> Optional[str]:
+        """
+        Exporta el modelo a ONNX (requiere skl2onnx) y retorna el SHA-256 del
+        archivo. Si no se puede exportar, elimina un .onnx previo para que no
+        quede desincronizado con el .pkl y retorna None.
+        """
+        try:
+            from skl2onnx import convert_sklearn
+            from skl2onnx.common.data_types import FloatTensorType
+            
+            onnx_model = convert_sklearn(
+                self.model,
+                initial_types=[('input', FloatTensorType([None, len(self.feature_names)]))],
+                # Probabilidades como tensor, no como lista de diccionarios
+                options={id(self.model): {'zipmap': False}}
+            )
+            onnx_bytes = onnx_model.SerializeToString()
+            with open(onnx_path, 'wb') as f:
+                f.write(onnx_bytes)
+        except Exception as e:
+            # ONNX es opcional: un fallo aquí no debe impedir guardar el .pkl
+            if not isinstance(e, ImportError):
+                print(f"Aviso: no se pudo exportar a ONNX ({e}); se usará sklearn")
+            try:
+                os.remove(onnx_path)
+            except OSError:
+                pass
+            return None
+        
+        print(f"Modelo ONNX guardado en: {onnx_path}")
+        return hashlib.sha256(onnx_bytes).hexdigest()
+    
     def load_model(self, filepath: str):
-        """Carga un modelo pre-entrenado"""
-        with open(filepath, 'rb') as f:
-            model_data = pickle.load(f)
+        """Carga un modelo pre-entrenado (joblib comprimido o pickle plano anterior)"""
+        model_data = joblib.load(filepath)
         
         self.model = model_data['model']
         self.feature_names = model_data['feature_names']
         self.is_trained = model_data['is_trained']
+        self._index_features()
+        self._forest = pack_forest(self.model) if self.is_trained else None
+        
+        # Si hay un .onnx exportado junto al .pkl, la inferencia va por ONNX Runtime
+        self._ort = None
+        onnx_path = onnx_path_for(filepath)
+        if ort is not None and os.path.exists(onnx_path):
+            with open(onnx_path, 'rb') as f:
+                onnx_bytes = f.read()
+            # Un .onnx de otro entrenamiento daría otras predicciones: solo se
+            # usa si su huella coincide con la guardada en el .pkl
+            if hashlib.sha256(onnx_bytes).hexdigest() == model_data.get('onnx_sha256'):
+                self._ort = ort.InferenceSession(onnx_bytes, providers=['CPUExecutionProvider'])
+            else:
+                print(f"Aviso: {onnx_path} no corresponde al modelo cargado; se usa sklearn")
         
         print(f"Modelo cargado desde: {filepath}")